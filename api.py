@@ -0,0 +1,231 @@
+"""Local JSON API with the dashboard's opportunity and ROI numbers.
+
+Usage: python api.py [--host 127.0.0.1] [--port 8765] [--data D-V4.xlsx] [--sheet Sheet1]
+
+  GET  /health                           data version and client count
+  GET  /clients                         client names
+  GET  /clients/<name>?bess_pct=10       one client's opportunities and ROI per option
+  POST /clients  {"clients": [...], "bess_pct": 10}
+                                         the same for many clients, in one vectorized lookup
+  GET  /metrics                          Prometheus text from the profiler
+
+Served with asyncio streams (HTTP/1.1 with keep-alive) from the same ClientStore
+snapshot as the dashboard, reloaded in the background when the workbook changes.
+"""
+import argparse
+import asyncio
+import json
+import os
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+
+from datastore import RELOAD_POLL_SECONDS, ClientStore
+from ingest import DATA_PATH, SHEET_NAME
+from profiling import PROFILER
+from roi import BESS_STEPS, ROI_OPTIONS
+
+API_HOST = os.environ.get("RAYS_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("RAYS_API_PORT", 8765))
+MAX_BODY_BYTES = 1 << 20
+MAX_BATCH = 10_000
+DEFAULT_BESS_PCT = 10
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _native(values):
+    """Python scalars for JSON, NaN as null"""
+    values = values.tolist()
+    return [None if isinstance(v, float) and v != v else v for v in values]
+
+
+def client_results(snapshot, positions, bess_pct):
+    """Opportunities and ROI (%) per option for the clients at `positions`, one dict each.
+
+    Plain array indexing into the snapshot's precomputed tables: per-request
+    pandas overhead would dominate the cost of a single-client lookup.
+    """
+    positions = np.asarray(positions, dtype=int)
+    opportunities, base_table = snapshot['opportunities'], snapshot['base_roi']
+    columns = {col: np.asarray(opportunities[col].array.take(positions)) for col in opportunities.columns}
+    columns['BESS Size (% of Solar)'] = np.full(len(positions), bess_pct)
+    roi = np.column_stack([
+        snapshot['bess_grid']['bess_roi'][positions, BESS_STEPS.index(bess_pct)] if option == 'BESS'
+        else base_table[option].to_numpy(dtype=float)[positions]
+        for option in ROI_OPTIONS
+    ]).reshape(len(positions), len(ROI_OPTIONS))
+    for i, option in enumerate(ROI_OPTIONS):
+        columns[f"{option} ROI (%)"] = roi[:, i]
+    best = roi.argmax(axis=1)
+    columns['Best Option'] = np.asarray(ROI_OPTIONS, dtype=object)[best]
+    columns['Best ROI (%)'] = roi[np.arange(len(roi)), best]
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*(_native(values) for values in columns.values()))]
+
+
+def _bess_pct(value):
+    """Whole-number BESS size from a query string or JSON value; 10.9 or 1e400 are rejected,
+    not truncated"""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    try:
+        bess_pct = int(value) if type(value) in (int, str) else None
+    except ValueError:
+        bess_pct = None
+    if bess_pct not in BESS_STEPS:
+        raise ApiError(400, f"bess_pct must be one of {BESS_STEPS}")
+    return bess_pct
+
+
+def get_client(store, name, query):
+    snapshot = store.snapshot
+    position = snapshot['index']['positions'].get(name)
+    if position is None:
+        raise ApiError(404, f"Unknown client: {name}")
+    bess_pct = _bess_pct(query.get('bess_pct', [DEFAULT_BESS_PCT])[0])
+    return {'version': snapshot['version'], **client_results(snapshot, [position], bess_pct)[0]}
+
+
+def post_clients(store, body):
+    try:
+        request = json.loads(body or b'{}')
+        names = request['clients']
+    except (ValueError, KeyError, TypeError):
+        raise ApiError(400, 'Expected a JSON body like {"clients": ["NAME", ...], "bess_pct": 10}')
+    if not isinstance(names, list) or len(names) > MAX_BATCH:
+        raise ApiError(400, f"clients must be a list of at most {MAX_BATCH} names")
+    bess_pct = _bess_pct(request.get('bess_pct', DEFAULT_BESS_PCT))
+    snapshot = store.snapshot
+    index = snapshot['index']['positions']
+    positions = [index.get(str(name)) for name in names]
+    return {
+        'version': snapshot['version'],
+        'results': client_results(snapshot, [p for p in positions if p is not None], bess_pct),
+        'missing': [name for name, p in zip(names, positions) if p is None],
+    }
+
+
+async def route(store, method, target, body):
+    """(status, content type, payload bytes) for one request"""
+    url = urlsplit(target)
+    path, query = url.path.rstrip('/'), parse_qs(url.query)
+    if path == '/health' and method == 'GET':
+        snapshot = store.snapshot
+        result = {'version': snapshot['version'], 'clients': len(snapshot['df']), 'last_error': store.last_error}
+    elif path == '/metrics' and method == 'GET':
+        return 200, 'text/plain; version=0.0.4', PROFILER.to_prometheus().encode()
+    elif path == '/clients' and method == 'GET':
+        snapshot = store.snapshot
+        result = {'version': snapshot['version'], 'clients': snapshot['index']['names']}
+    elif path.startswith('/clients/') and method == 'GET':
+        with PROFILER.stage('api_get_client'):
+            result = get_client(store, unquote(path[len('/clients/'):]), query)
+    elif path == '/clients' and method == 'POST':
+        with PROFILER.stage('api_post_clients'):
+            # Large batches are NumPy/pandas work; keep the event loop free for other connections
+            result = await asyncio.to_thread(post_clients, store, body)
+    elif path in ('/health', '/metrics', '/clients') or path.startswith('/clients/'):
+        raise ApiError(405, f"{method} is not supported on {path}")
+    else:
+        raise ApiError(404, f"No route for {path}")
+    return 200, 'application/json', json.dumps(result).encode()
+
+
+async def read_request(reader):
+    """(method, target, headers, body) of the next request, or None when the client hung up"""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode('latin-1').split(' ', 2)
+    except ValueError:
+        raise ApiError(400, "Malformed request line")
+    headers = {}
+    while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+        key, _, value = line.decode('latin-1').partition(':')
+        headers[key.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise ApiError(400, "Malformed Content-Length")
+    if length < 0:
+        raise ApiError(400, "Malformed Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise ApiError(413, f"Request bodies are limited to {MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), target, headers, body
+
+
+def _response(status, content_type, payload, keep_alive):
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\nContent-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('latin-1') + payload
+
+
+def make_handler(store):
+    async def handle(reader, writer):
+        try:
+            while True:
+                # A request that fails to parse leaves the stream in an unknown state: answer, then close
+                keep_alive = False
+                try:
+                    request = await read_request(reader)
+                    if request is None:
+                        break
+                    method, target, headers, body = request
+                    keep_alive = headers.get('connection', '').lower() != 'close'
+                    status, content_type, payload = await route(store, method, target, body)
+                except ApiError as e:
+                    status, content_type, payload = e.status, 'application/json', json.dumps({'error': str(e)}).encode()
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as e:
+                    # Always answer: an unanswered request looks like a dropped connection
+                    status, content_type = 500, 'application/json'
+                    payload = json.dumps({'error': f"{type(e).__name__}: {e}"}).encode()
+                PROFILER.count(f'api_status_{status}')
+                writer.write(_response(status, content_type, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def serve(store, host=API_HOST, port=API_PORT):
+    server = await asyncio.start_server(make_handler(store), host, port)
+    print(f"Serving {len(store.snapshot['df']):,} clients on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=API_HOST)
+    parser.add_argument('--port', type=int, default=API_PORT)
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--sheet', default=SHEET_NAME, help="Sheet to read ('' for every sheet)")
+    args = parser.parse_args(argv)
+
+    store = ClientStore(args.data, args.sheet or None)
+    store.start_watcher(RELOAD_POLL_SECONDS)
+    try:
+        asyncio.run(serve(store, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
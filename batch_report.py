@@ -0,0 +1,188 @@
+"""Headless Client Overview / Available Opportunities / ROI Analysis reports for a whole portfolio.
+
+Usage: python batch_report.py --out reports [--bess-pct 10] [--client NAME ...] [--match REGEX]
+                              [--workers N] [--chunk-size 500]
+
+Writes one HTML and one CSV report per client, clients.csv (one summary row per
+client) and portfolio_summary.csv (clients and ROI by recommended option). A client
+whose report cannot be rendered gets an Error in clients.csv instead of stopping
+the batch, and the command then exits with a non-zero status.
+"""
+import argparse
+import csv
+import html
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from calc import waiver_percentage
+from ingest import DATA_PATH, SHEET_NAME, iter_cached, workbook_store
+from report import (OPPORTUNITY_FORMATTERS, VALUE_FORMATTERS, client_info_tables,
+                    opportunities_table, render_table, roi_chart_data)
+from roi import ROI_OPTIONS, compute_roi
+
+PAGE_STYLE = "body{font-family:sans-serif;margin:2em;} table{border-collapse:collapse;} td,th{padding:4px 10px;}"
+
+
+def report_name(position, client):
+    """Stable, filesystem-safe file stem; the row position keeps duplicate names apart"""
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', str(client)).strip('-').lower() or 'client'
+    return f"{position:06d}-{slug}"
+
+
+def client_report(selected, roi_row, bess_pct):
+    """Standalone HTML page with the same sections as the dashboard, plus the same
+    content as (Section, Parameter, Value) rows for the CSV report"""
+    load_info, solar_info = client_info_tables(selected)
+    opportunities = opportunities_table(selected)
+    roi_data = roi_chart_data(roi_row, bess_pct)
+    best_option = roi_data['Option'][ROI_OPTIONS.index(roi_row['Best Option'])]
+
+    rows = [("Basic Load Information", *row) for row in load_info.itertuples(index=False)]
+    rows += [("Existing Solar Setup", *row) for row in solar_info.itertuples(index=False)]
+    for opportunity, *values in opportunities.itertuples(index=False):
+        rows += [("Available Opportunities", f"{opportunity} - {field}", value)
+                 for field, value in zip(opportunities.columns[1:], values)]
+    rows += [("ROI Analysis", f"{option} ROI (%)", f"{roi:.2f}") for option, roi in roi_data.itertuples(index=False)]
+
+    roi_data['ROI (%)'] = roi_data['ROI (%)'].map(lambda x: f"{x:.2f}")
+    client = html.escape(str(selected['Client Name']))
+    page = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{client}</title><style>{PAGE_STYLE}</style></head><body>
+<h1>Client Overview: {client}</h1>
+<h2>Basic Load Information</h2>
+{render_table(load_info, VALUE_FORMATTERS)}
+<h2>Existing Solar Setup</h2>
+{render_table(solar_info, VALUE_FORMATTERS)}
+<h1>Available Opportunities</h1>
+{render_table(opportunities, OPPORTUNITY_FORMATTERS)}
+<h1>ROI Analysis</h1>
+<p>Transmission and Wheeling Charges Waiver: {waiver_percentage(bess_pct)}%</p>
+{render_table(roi_data, {})}
+<p><b>Recommended Option: {best_option} (ROI: {roi_row['Best ROI (%)']:.2f}%)</b></p>
+</body></html>
+"""
+    return page, rows
+
+
+def render_chunk(chunk, bess_pct, out_dir):
+    """Write the reports for one slice of the client table and return its summary rows"""
+    summary = compute_roi(chunk, bess_pct)
+    reports, errors = [], []
+    for position, (_, selected), (_, roi_row) in zip(chunk.index, chunk.iterrows(), summary.iterrows()):
+        name = report_name(position, selected['Client Name'])
+        try:
+            page, rows = client_report(selected, roi_row, bess_pct)
+            with open(os.path.join(out_dir, name + ".html"), 'w', encoding='utf-8') as f:
+                f.write(page)
+            with open(os.path.join(out_dir, name + ".csv"), 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['Section', 'Parameter', 'Value'])
+                writer.writerows(rows)
+        except Exception as e:
+            # One client that cannot be rendered is reported in the summary, not fatal to the batch
+            name, error = '', f"{type(e).__name__}: {e}"
+        else:
+            error = ''
+        reports.append(name)
+        errors.append(error)
+    summary['Report'] = reports
+    summary['Error'] = errors
+    return summary
+
+
+def select_clients(df, clients=None, match=None):
+    if clients:
+        df = df[df['Client Name'].isin(clients)]
+    if match:
+        df = df[df['Client Name'].astype(str).str.contains(match, regex=True)]
+    return df
+
+
+def iter_chunks(df, chunk_size):
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+
+def iter_store_chunks(store, chunk_size, clients=None, match=None):
+    """Filtered slices of the cached client table, read one record batch at a time"""
+    for batch in iter_cached(store):
+        yield from iter_chunks(select_clients(batch, clients, match), chunk_size)
+
+
+def run(chunks, total, bess_pct, out_dir, workers=None, progress=sys.stderr):
+    """Render every chunk on a process pool with at most 2 chunks per worker in flight"""
+    os.makedirs(out_dir, exist_ok=True)
+    summary_path = os.path.join(out_dir, "clients.csv")
+    if os.path.exists(summary_path):
+        os.remove(summary_path)
+    totals = {}
+    done = 0
+    started = time.perf_counter()
+
+    def collect(summary):
+        nonlocal done
+        summary.to_csv(summary_path, mode='a', header=done == 0, index=False)
+        for option, group in summary.groupby('Best Option'):
+            count, roi_sum, failed = totals.get(option, (0, 0.0, 0))
+            totals[option] = (count + len(group), roi_sum + group['Best ROI (%)'].sum(),
+                              failed + (group['Error'] != '').sum())
+        done += len(summary)
+        rate = done / max(time.perf_counter() - started, 1e-9)
+        print(f"[{done}/{total}] clients reported ({rate:,.0f}/s)", file=progress, flush=True)
+        for client, error in summary.loc[summary['Error'] != '', ['Client Name', 'Error']].itertuples(index=False):
+            print(f"Could not render the report for {client}: {error}", file=progress, flush=True)
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in chunks:
+            collect(render_chunk(chunk, bess_pct, out_dir))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            for chunk in chunks:
+                pending.add(pool.submit(render_chunk, chunk, bess_pct, out_dir))
+                if len(pending) >= 2 * workers:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        collect(future.result())
+            for future in pending:
+                collect(future.result())
+
+    portfolio = pd.DataFrame(
+        [(option, count, roi_sum / count, failed) for option, (count, roi_sum, failed) in sorted(totals.items())],
+        columns=['Best Option', 'Clients', 'Mean Best ROI (%)', 'Failed Reports']
+    )
+    portfolio.to_csv(os.path.join(out_dir, "portfolio_summary.csv"), index=False)
+    return portfolio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--sheet', default=SHEET_NAME, help="Sheet to read; empty for every sheet")
+    parser.add_argument('--out', default="reports")
+    parser.add_argument('--bess-pct', type=int, default=10, choices=range(0, 101, 5), metavar='{0,5,...,100}')
+    parser.add_argument('--client', action='append', help="Only report this client (repeatable)")
+    parser.add_argument('--match', help="Only report clients whose name matches this regex")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=500)
+    args = parser.parse_args(argv)
+
+    store = workbook_store(args.data, args.sheet or None)
+    total = sum(len(select_clients(names, args.client, args.match))
+                for names in iter_cached(store, columns=['Client Name']))
+    chunks = iter_store_chunks(store, args.chunk_size, args.client, args.match)
+    portfolio = run(chunks, total, args.bess_pct, args.out, args.workers)
+    print(portfolio.to_string(index=False))
+    failed = portfolio['Failed Reports'].sum()
+    if failed:
+        raise SystemExit(f"{failed:,} client reports could not be rendered; see the Error column of clients.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Portfolio chart payloads and build times: server-side aggregates vs raw client rows.
+
+Run from the repo root: python -m benchmarks.bench_charts [--sizes 1000 100000]
+"""
+import argparse
+import timeit
+
+import altair as alt
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_portfolio
+from chartdata import payload_bytes, portfolio_chart_data
+from ranking import build_ranking
+from roi import base_roi, compute_bess_grid, compute_opportunities
+
+DEFAULT_SIZES = [1_000, 100_000]
+
+
+def aggregated_chart(charts):
+    return alt.Chart(charts['roi_histograms'][charts['roi_histograms']['Option'] == 'Wind']).mark_bar().encode(
+        x=alt.X('ROI from (%)', bin='binned'), x2='ROI to (%)', y='Clients')
+
+
+def raw_chart(ranking):
+    rows = pd.DataFrame({'Wind ROI (%)': ranking['values']['Wind ROI (%)']})
+    return alt.Chart(rows).mark_bar().encode(x=alt.X('Wind ROI (%)', bin=alt.Bin(maxbins=40)), y='count()')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    # Raw-row charts above 5000 rows are refused by Altair unless the limit is lifted
+    alt.data_transformers.disable_max_rows()
+
+    for rows in args.sizes:
+        df = synthetic_portfolio(rows)
+        ranking = build_ranking(df, compute_opportunities(df), base_roi(df), compute_bess_grid(df), 10)
+        aggregate = min(timeit.repeat(lambda: portfolio_chart_data(df, ranking), number=1, repeat=args.repeat))
+        charts = portfolio_chart_data(df, ranking)
+        spec = min(timeit.repeat(lambda: payload_bytes(aggregated_chart(charts)), number=1, repeat=args.repeat))
+        raw_spec = min(timeit.repeat(lambda: payload_bytes(raw_chart(ranking)), number=1, repeat=args.repeat))
+        print(f"{rows:,} clients")
+        print(f"  aggregate all charts {aggregate * 1000:9.1f} ms")
+        print(f"  ROI histogram, bins  {payload_bytes(aggregated_chart(charts)) / 1024:9.1f} KB  "
+              f"spec {spec * 1000:7.1f} ms")
+        print(f"  ROI histogram, rows  {payload_bytes(raw_chart(ranking)) / 1024:9.1f} KB  "
+              f"spec {raw_spec * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Throughput of the load, opportunity and ROI stages on synthetic portfolios.
+
+Run from the repo root: python -m benchmarks.bench_core [--sizes 1000 100000 1000000]
+                                                          [--history benchmarks/history.jsonl]
+
+Each run prints clients/s per stage and, with --history, appends one JSON line
+(timestamp, git commit, sizes, timings) so throughput can be tracked over time.
+The same stages run under pytest-benchmark in tests/test_benchmarks.py.
+"""
+import argparse
+import json
+import os
+import subprocess
+import tempfile
+import time
+import timeit
+
+from benchmarks.synthetic import synthetic_portfolio
+from ingest import iter_chunks, read_cached, write_store
+from ranking import build_ranking, query
+from roi import BESS_STEPS, base_roi, compute_bess_grid, compute_opportunities, compute_roi
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+
+
+def best_of(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def bench_size(rows, workdir, repeat):
+    """Seconds per stage for one portfolio size"""
+    df = synthetic_portfolio(rows)
+    csv_path = os.path.join(workdir, f"portfolio-{rows}.csv")
+    store_path = os.path.join(workdir, f"portfolio-{rows}.arrow")
+    df.to_csv(csv_path, index=False)
+    # Loading is slow enough at 1M rows that one pass is representative
+    load_repeat = 1 if rows >= 1_000_000 else repeat
+
+    timings = {
+        'ingest_csv': best_of(lambda: write_store(iter_chunks(csv_path), store_path), load_repeat),
+        'read_store': best_of(lambda: read_cached(store_path), repeat),
+    }
+    df = read_cached(store_path)
+    timings.update({
+        'opportunities': best_of(lambda: compute_opportunities(df), repeat),
+        'roi': best_of(lambda: compute_roi(df, 10), repeat),
+        'roi_base': best_of(lambda: base_roi(df), repeat),
+        'bess_grid': best_of(lambda: compute_bess_grid(df), repeat),
+    })
+    opportunities, base_table, grid = compute_opportunities(df), base_roi(df), compute_bess_grid(df)
+    timings['ranking_build'] = best_of(lambda: build_ranking(df, opportunities, base_table, grid, 10), repeat)
+    ranking = build_ranking(df, opportunities, base_table, grid, 10)
+    timings['ranking_top50'] = best_of(lambda: query(ranking, 'Wind ROI (%)', 50, voltage_levels=[132.0]), repeat)
+    return timings
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--history', help="Append results as one JSON line to this file")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in args.sizes:
+            results[rows] = bench_size(rows, workdir, args.repeat)
+            print(f"{rows:,} clients ({len(BESS_STEPS)} BESS steps in the grid)")
+            for stage, seconds in results[rows].items():
+                print(f"  {stage:<14} {seconds * 1000:10.1f} ms  {rows / seconds:14,.0f} clients/s")
+
+    if args.history:
+        record = {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': git_commit(),
+                  'seconds': {str(rows): timings for rows, timings in results.items()}}
+        with open(args.history, 'a') as f:
+            f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""Throughput of the 8760-hour BESS dispatch across every BESS slider size.
+
+Run from the repo root: python -m benchmarks.bench_dispatch [--sizes 100 1000 10000]
+"""
+import argparse
+import timeit
+
+from benchmarks.synthetic import synthetic_portfolio
+from dispatch import CHUNK_CLIENTS, DAYS, HOURS, dispatch_grid
+from roi import BESS_STEPS
+
+DEFAULT_SIZES = [100, 1_000, 10_000]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--chunk-clients', type=int, default=CHUNK_CLIENTS)
+    args = parser.parse_args()
+
+    for rows in args.sizes:
+        df = synthetic_portfolio(rows)
+        seconds = min(timeit.repeat(lambda: dispatch_grid(df, chunk_clients=args.chunk_clients),
+                                    number=1, repeat=args.repeat))
+        steps = rows * len(BESS_STEPS) * DAYS * HOURS
+        print(f"{rows:,} clients x {len(BESS_STEPS)} sizes x {DAYS * HOURS} hours: {seconds * 1000:10.1f} ms  "
+              f"{rows / seconds:10,.0f} clients/s  {steps / seconds / 1e6:8,.0f} M battery-hours/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Micro-benchmark: batch Indian-number formatter vs the original per-value loop.
+
+Run from the repo root: python -m benchmarks.bench_format [--rows N]
+"""
+import argparse
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from formatting import format_indian, format_indian_batch
+
+
+def legacy_format_indian(t):
+    """The per-value implementation main.py shipped with, kept as the baseline"""
+    try:
+        t = float(t)
+        if t.is_integer():
+            t = int(t)
+        
+        s = str(t).split('.')
+        if len(s) == 1:
+            s = s[0]
+            if len(s) > 3:
+                last_three = s[-3:]
+                other_numbers = s[:-3]
+                res = ""
+                while len(other_numbers) > 2:
+                    res = "," + other_numbers[-2:] + res
+                    other_numbers = other_numbers[:-2]
+                if other_numbers:
+                    res = other_numbers + res
+                return res + "," + last_three
+            return s
+        else:
+            before_decimal = s[0]
+            after_decimal = s[1][:2]
+            if len(before_decimal) > 3:
+                last_three = before_decimal[-3:]
+                other_numbers = before_decimal[:-3]
+                res = ""
+                while len(other_numbers) > 2:
+                    res = "," + other_numbers[-2:] + res
+                    other_numbers = other_numbers[:-2]
+                if other_numbers:
+                    res = other_numbers + res
+                return res + "," + last_three + "." + after_decimal
+            return before_decimal + "." + after_decimal
+    except:
+        return str(t)
+
+
+def sample_values(rows, seed=0):
+    """Mix of kWh-sized integers and fractional capacities, like a portfolio export"""
+    rng = np.random.default_rng(seed)
+    kwh = rng.integers(0, 10**9, rows).astype(float)
+    mw = rng.uniform(0, 500, rows).round(3)
+    return pd.Series(np.where(rng.random(rows) < 0.5, kwh, mw))
+
+
+def best_of(func, repeat=5):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    values = sample_values(args.rows)
+    timings = {
+        'legacy per-value': best_of(lambda: [legacy_format_indian(v) for v in values]),
+        'scalar per-value': best_of(lambda: [format_indian(v) for v in values]),
+        'batch': best_of(lambda: format_indian_batch(values)),
+    }
+    baseline = timings['legacy per-value']
+    print(f"{args.rows:,} values")
+    for name, seconds in timings.items():
+        print(f"  {name:<18} {seconds * 1000:9.1f} ms  {args.rows / seconds:12,.0f} values/s  x{baseline / seconds:.1f}")
+
+
+if __name__ == "__main__":
+    main()
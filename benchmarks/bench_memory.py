@@ -0,0 +1,38 @@
+"""Memory footprint of the client table in the default and compact (RAYS_COMPACT=1) modes.
+
+Run from the repo root: python -m benchmarks.bench_memory [--rows 100000]
+"""
+import argparse
+import os
+import tempfile
+import timeit
+
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_portfolio
+from ingest import compact_store, iter_chunks, memory_report, read_cached, read_shared, write_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = os.path.join(workdir, "portfolio.csv")
+        store_path = os.path.join(workdir, "portfolio.arrow")
+        synthetic_portfolio(args.rows).to_csv(csv_path, index=False)
+        write_store(iter_chunks(csv_path), store_path)
+        compact_path = compact_store(store_path)
+
+        before, after = read_cached(store_path), read_shared(compact_path)
+        with pd.option_context('display.width', 200, 'display.max_columns', None):
+            print(memory_report(before, after).round(1))
+        print(f"\nArrow file: {os.path.getsize(store_path):,} bytes, compact: {os.path.getsize(compact_path):,} bytes")
+        for name, read in (('read_cached', lambda: read_cached(store_path)),
+                           ('read_shared (compact)', lambda: read_shared(compact_path))):
+            print(f"{name:<22} {min(timeit.repeat(read, number=1, repeat=3)) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Cold-start time to first render of the dashboard, in fresh Python processes.
+
+Run from the repo root: python -m benchmarks.bench_startup [--repeat 5] [--section "📈 ROI Analysis"]
+
+Each run launches a new interpreter that imports Streamlit's test runner and
+renders main.py once (reading the workbook through the usual Arrow IPC cache,
+which the first run fills). Prints the time from process launch to the end of
+that first render, how long the interpreter took to start, and whether Altair
+had to be loaded: the default Available Opportunities tab draws no chart, so
+it should not.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+# Runs in the child; prints one JSON line after the first render
+CHILD = r"""
+import json, sys, time
+started = time.time()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file(sys.argv[1], default_timeout=600)
+if sys.argv[2]:
+    app.session_state['client_section'] = sys.argv[2]
+app.run()
+rendered = time.time()
+altair_loaded = 'altair' in sys.modules
+altair_started = time.perf_counter()
+import altair
+print(json.dumps({'started': started, 'rendered': rendered, 'exception': [str(e.value) for e in app.exception],
+                  'altair_loaded': altair_loaded, 'altair_import': time.perf_counter() - altair_started}))
+"""
+
+
+def first_render(app, section):
+    launched = time.time()
+    result = subprocess.run([sys.executable, "-c", CHILD, app, section or ""], capture_output=True, text=True,
+                            cwd=os.path.dirname(app), check=True)
+    run = json.loads(result.stdout.strip().splitlines()[-1])
+    if run['exception']:
+        raise SystemExit(f"The app failed to render: {run['exception']}")
+    run['interpreter'] = run['started'] - launched
+    run['total'] = run['rendered'] - launched
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--section', help="Client page tab to open on the first render (default: the first)")
+    parser.add_argument('--app', default=APP)
+    args = parser.parse_args()
+
+    first_render(args.app, args.section)  # fills the workbook cache
+    runs = [first_render(args.app, args.section) for _ in range(args.repeat)]
+    for label, key in [("Interpreter start", 'interpreter'), ("Time to first render", 'total')]:
+        values = np.array([run[key] for run in runs]) * 1000
+        print(f"{label:<22} min {values.min():8.1f} ms  median {np.median(values):8.1f} ms")
+    deferred = [run['altair_import'] for run in runs if not run['altair_loaded']]
+    print(f"Altair imported during the first render in {len(runs) - len(deferred)} of {len(runs)} runs"
+          + (f"; deferring it saved {np.median(deferred) * 1000:.1f} ms" if deferred else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Load test for the local API (start it first with python api.py).
+
+Run from the repo root: python -m benchmarks.load_test [--port 8765] [--concurrency 32]
+                                                       [--requests 5000] [--batch 100]
+
+Each connection keeps its socket open and alternates GET /clients/<name> with,
+every --batch-every requests, a POST /clients batch of --batch names. Prints
+requests/s and latency percentiles per request type.
+"""
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import quote
+
+import numpy as np
+
+
+async def request(reader, writer, method, path, body=b''):
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+                 + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        key, _, value = line.decode('latin-1').partition(':')
+        if key.strip().lower() == 'content-length':
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def fetch_json(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        status, payload = await request(reader, writer, 'GET', path)
+    finally:
+        writer.close()
+    if status != 200:
+        raise SystemExit(f"GET {path} failed with HTTP {status}")
+    return json.loads(payload)
+
+
+async def worker(host, port, names, jobs, batch, batch_every, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    rng = np.random.default_rng()
+    try:
+        while jobs:
+            n = jobs.pop()
+            if batch_every and n % batch_every == 0:
+                kind, method, path = 'post_batch', 'POST', '/clients'
+                body = json.dumps({'clients': rng.choice(names, batch).tolist(), 'bess_pct': 10}).encode()
+            else:
+                kind, method, path, body = 'get_client', 'GET', f"/clients/{quote(rng.choice(names))}", b''
+            started = time.perf_counter()
+            status, _ = await request(reader, writer, method, path, body)
+            latencies.setdefault(kind, []).append(time.perf_counter() - started)
+            if status != 200:
+                errors[status] = errors.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run(args):
+    health = await fetch_json(args.host, args.port, '/health')
+    names = np.asarray(args.client or (await fetch_json(args.host, args.port, '/clients'))['clients'])
+    print(f"API data version {health['version']} with {health['clients']:,} clients; "
+          f"{args.requests:,} requests over {args.concurrency} connections")
+    jobs = list(range(args.requests, 0, -1))
+    latencies, errors = {}, {}
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(args.host, args.port, names, jobs, args.batch, args.batch_every,
+                                  latencies, errors) for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"{total:,} requests in {elapsed:.2f} s: {total / elapsed:,.0f} requests/s, errors: {errors or 'none'}")
+    for kind, values in sorted(latencies.items()):
+        p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000
+        print(f"  {kind:<11} n={len(values):<7,} p50 {p50:7.2f} ms  p95 {p95:7.2f} ms  p99 {p99:7.2f} ms  "
+              f"max {max(values) * 1000:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--batch', type=int, default=100, help="Client names per POST")
+    parser.add_argument('--batch-every', type=int, default=10, help="Send a POST every N requests (0: never)")
+    parser.add_argument('--client', action='append', help="Client name to query (default: every client)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
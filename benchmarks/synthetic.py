@@ -0,0 +1,37 @@
+"""Synthetic HT-consumer portfolios with the same columns as D-V4.xlsx."""
+import numpy as np
+import pandas as pd
+
+VOLTAGE_LEVELS = [11, 22, 33, 66, 132, 220]
+
+
+def synthetic_portfolio(rows, seed=0):
+    """Random but plausible client table: CD below SL, solar AC below CD, DC/AC around 1.4"""
+    rng = np.random.default_rng(seed)
+    sanctioned_load = rng.lognormal(1.5, 1.0, rows).round(3)
+    contract_demand = (sanctioned_load * rng.uniform(0.6, 1.0, rows)).round(3)
+    solar_ac = (contract_demand * rng.uniform(0, 1.0, rows)).round(2)
+    load_factor = rng.uniform(0.2, 0.9, rows).round(4)
+    annual_consumption = (contract_demand * 1000 * 8760 * load_factor).round(1)
+    evening, morning = rng.uniform(0.1, 0.3, rows), rng.uniform(0.03, 0.12, rows)
+    setoff = (solar_ac * 1000 * 1650 * rng.uniform(0.8, 1.1, rows)).round()
+    return pd.DataFrame({
+        'Client Name': [f"CLIENT {i:07d}" for i in range(rows)],
+        'Voltage Level': rng.choice(VOLTAGE_LEVELS, rows).astype(float),
+        'Sanctioned Load (mVA)': sanctioned_load,
+        'Contract Demand (mVA)': contract_demand,
+        'Average Load Factor': load_factor,
+        'Annual Consumption': annual_consumption,
+        'Installed Solar Capacity (AC)': solar_ac,
+        'Installed Solar Capacity (DC)': (solar_ac * rng.uniform(1.2, 1.5, rows)).round(2),
+        'Losses': rng.uniform(0.03, 0.2, rows).round(3),
+        'Annual Setoff': setoff,
+        'Percent Green Consumption': np.minimum(setoff / annual_consumption, 1),
+        'Base Tariff': rng.choice([6.8, 7.3, 7.8], rows),
+        'Load Factor Rebate': rng.integers(0, 2, rows).astype(float),
+        'Power Tariff': rng.uniform(6.5, 8.5, rows).round(2),
+        '6-10 PM Consumption': evening,
+        '6-8 AM Consumption': morning,
+        'Peak Hour Consumption (6-8 AM and 6-10 PM)': annual_consumption * (evening + morning),
+        '12-4 PM Consumption': annual_consumption * rng.uniform(0.1, 0.25, rows),
+    })
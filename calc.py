@@ -0,0 +1,116 @@
+"""Opportunity, waiver and ROI formulas, free of any UI code.
+
+Every function takes scalars or NumPy arrays (broadcast against each other) and
+returns the same shape: NumPy scalars for scalar inputs, arrays otherwise.
+"""
+import numpy as np
+
+CAPEX = {
+    'solar': 3.5e6,
+    'bess': 4.0e6,
+    'wind': 6.5e6
+}
+GENERATION = {
+    'solar': 16.5e5,
+    'wind': 26.0e5
+}
+MIN_AVAILABLE_PCT = 20
+DC_AC_RATIO = 1.4
+BESS_WAIVER_RATE = 1.65
+
+
+def _float(x):
+    return np.asarray(x, dtype=float)
+
+
+def _ratio(num, den):
+    """num / den where den > 0, else 0"""
+    num, den = np.broadcast_arrays(_float(num), _float(den))
+    return np.divide(num, den, out=np.zeros(num.shape), where=den > 0)[()]
+
+
+def waiver_percentage(bess_pct):
+    """Transmission and wheeling charges waiver (%) for a BESS size (% of solar)"""
+    if np.ndim(bess_pct) == 0:
+        return 0 if bess_pct == 0 else (75 + (bess_pct//5 - 1)*5 if bess_pct < 30 else 100)
+    bess_pct = np.asarray(bess_pct)
+    return np.where(bess_pct == 0, 0, np.where(bess_pct < 30, 75 + (bess_pct//5 - 1)*5, 100))
+
+
+def solar_to_cd(contract_demand, solar_ac):
+    """Opportunity 1: solar up to the contract demand.
+
+    Returns (available AC, available % of CD, viable, recommended DC).
+    """
+    contract_demand, solar_ac = _float(contract_demand), _float(solar_ac)
+    available_ac = contract_demand - solar_ac
+    available_pct = _ratio(available_ac, contract_demand) * 100
+    viable = available_pct >= MIN_AVAILABLE_PCT
+    return available_ac[()], available_pct, viable, (available_ac * DC_AC_RATIO)[()]
+
+
+def solar_to_sl(contract_demand, sanctioned_load, solar_ac):
+    """Opportunity 2: raise CD to the sanctioned load and add solar.
+
+    Returns (available AC, available % of CD, viable, recommended DC, CD increase);
+    the CD increase is 0 when the sanctioned load does not exceed the CD.
+    """
+    contract_demand, sanctioned_load, solar_ac = _float(contract_demand), _float(sanctioned_load), _float(solar_ac)
+    available_ac = sanctioned_load - solar_ac
+    available_pct = _ratio(available_ac, contract_demand) * 100
+    viable = (sanctioned_load > contract_demand) & (available_pct >= MIN_AVAILABLE_PCT)
+    cd_increase = np.maximum(sanctioned_load - contract_demand, 0)
+    return available_ac[()], available_pct, viable, (available_ac * DC_AC_RATIO)[()], cd_increase[()]
+
+
+def bess_mw(solar_dc, bess_pct):
+    """BESS power (MW) for a size given as % of the installed solar DC capacity (MW)"""
+    return _float(solar_dc) * _float(bess_pct)/100
+
+
+def solar_roi(contract_demand, sanctioned_load, solar_ac, base_tariff, capex=CAPEX, generation=GENERATION):
+    """(Solar to CD, Solar to SL) simple annual yield, 0 where no capacity is available"""
+    available_cd = _float(contract_demand) - _float(solar_ac)
+    available_sl = _float(sanctioned_load) - _float(solar_ac)
+    to_cd = _ratio(available_cd * generation['solar'] * base_tariff, available_cd * capex['solar'])
+    to_sl = _ratio(available_sl * generation['solar'] * base_tariff, available_sl * capex['solar'])
+    return to_cd, to_sl
+
+
+def bess_roi(annual_consumption, solar_dc, bess_pct, capex=CAPEX):
+    """BESS simple annual yield from the transmission/wheeling waiver"""
+    waiver = waiver_percentage(bess_pct)
+    return _ratio(_float(annual_consumption) * (BESS_WAIVER_RATE * _float(waiver)/100),
+                  bess_mw(solar_dc, bess_pct) * capex['bess'])
+
+
+def wind_roi(contract_demand, base_tariff, capex=CAPEX, generation=GENERATION):
+    """Wind simple annual yield sized to the contract demand"""
+    wind_mw = _float(contract_demand)
+    return _ratio(wind_mw * generation['wind'] * _float(base_tariff), wind_mw * capex['wind'])
+
+
+def option_economics(contract_demand, sanctioned_load, solar_ac, solar_dc, annual_consumption,
+                     base_tariff, bess_pct, capex=CAPEX, generation=GENERATION):
+    """Up-front cost and year-one savings of (Solar to CD, Solar to SL, BESS, Wind), stacked on a last axis.
+
+    These are the numerator and denominator of the simple yields above; options
+    with no capacity to install get zero cost and zero savings.
+    """
+    base_tariff = _float(base_tariff)
+    available_cd = np.maximum(_float(contract_demand) - _float(solar_ac), 0)
+    available_sl = np.maximum(_float(sanctioned_load) - _float(solar_ac), 0)
+    bess = bess_mw(solar_dc, bess_pct)
+    wind_mw = np.maximum(_float(contract_demand), 0)
+    waiver = _float(waiver_percentage(bess_pct))
+
+    cost = np.stack(np.broadcast_arrays(
+        available_cd * capex['solar'], available_sl * capex['solar'], bess * capex['bess'], wind_mw * capex['wind']
+    ), axis=-1)
+    savings = np.stack(np.broadcast_arrays(
+        available_cd * generation['solar'] * base_tariff,
+        available_sl * generation['solar'] * base_tariff,
+        np.where(bess > 0, _float(annual_consumption) * (BESS_WAIVER_RATE * waiver/100), 0),
+        wind_mw * generation['wind'] * base_tariff,
+    ), axis=-1)
+    return cost, savings
@@ -0,0 +1,85 @@
+"""Portfolio chart data aggregated on the server, so charts ship bins instead of client rows."""
+import json
+
+import numpy as np
+import pandas as pd
+
+from roi import ROI_OPTIONS, _column
+
+ROI_BINS = 40
+# ROI histograms span up to this percentile; larger values are counted in the last bin
+ROI_CLIP_PERCENTILE = 99
+GREEN_BAND_PCT = 10
+
+
+def roi_histograms(ranking, options=ROI_OPTIONS, bins=ROI_BINS):
+    """Clients per ROI (%) bin for each option, in long form (Option, ROI from, ROI to, Clients)"""
+    frames = []
+    for option in options:
+        roi = ranking['values'][f"{option} ROI (%)"]
+        roi = roi[np.isfinite(roi)]
+        if not len(roi):
+            continue
+        high = max(np.percentile(roi, ROI_CLIP_PERCENTILE), roi.min() + 1e-9)
+        counts, edges = np.histogram(np.minimum(roi, high), bins=bins, range=(roi.min(), high))
+        frames.append(pd.DataFrame({'Option': option, 'ROI from (%)': edges[:-1], 'ROI to (%)': edges[1:],
+                                    'Clients': counts}))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+        columns=['Option', 'ROI from (%)', 'ROI to (%)', 'Clients'])
+
+
+def headroom_by_voltage(ranking):
+    """Clients and total / mean available CD and SL capacity per voltage level"""
+    voltage = ranking['voltage']
+    known = ~np.isnan(voltage)
+    levels, codes = np.unique(voltage[known], return_inverse=True)
+    clients = np.bincount(codes, minlength=len(levels))
+    table = pd.DataFrame({'Voltage Level (kV)': levels, 'Clients': clients})
+    for metric in ('Available CD AC', 'Available SL AC'):
+        values = np.nan_to_num(np.maximum(ranking['values'][metric][known], 0))
+        total = np.bincount(codes, weights=values, minlength=len(levels))
+        table[f"Total {metric}"] = total
+        table[f"Mean {metric}"] = np.divide(total, clients, out=np.zeros(len(levels)), where=clients > 0)
+    return table
+
+
+def green_share(df, band_pct=GREEN_BAND_PCT):
+    """Clients, consumption and green consumption per Percent Green Consumption band"""
+    share = np.clip(_column(df, 'Percent Green Consumption', np.nan), 0, 1) * 100
+    consumption = _column(df, 'Annual Consumption')
+    known = ~np.isnan(share)
+    edges = np.arange(0, 100 + band_pct, band_pct)
+    band = np.minimum((share[known] // band_pct).astype(int), len(edges) - 2)
+    n_bands = len(edges) - 1
+    consumption = np.nan_to_num(consumption[known])
+    return pd.DataFrame({
+        'Green share from (%)': edges[:-1],
+        'Green share to (%)': edges[1:],
+        'Clients': np.bincount(band, minlength=n_bands),
+        'Annual Consumption': np.bincount(band, weights=consumption, minlength=n_bands),
+        'Green Consumption': np.bincount(band, weights=consumption * share[known] / 100, minlength=n_bands),
+    })
+
+
+def portfolio_chart_data(df, ranking):
+    """Every portfolio chart's aggregated table, keyed by chart"""
+    return {
+        'roi_histograms': roi_histograms(ranking),
+        'headroom_by_voltage': headroom_by_voltage(ranking),
+        'green_share': green_share(df),
+    }
+
+
+def payload_bytes(chart):
+    """Size of the Vega-Lite spec (data included) that st.altair_chart sends to the browser"""
+    return len(json.dumps(chart.to_dict()).encode())
+
+
+def raw_payload_bytes(columns, sample=1000):
+    """Estimated size of shipping every client row of `columns` (name -> array) as Vega-Lite
+    inline data, extrapolated from the first `sample` rows so it stays cheap at any size"""
+    rows = len(next(iter(columns.values()), []))
+    table = pd.DataFrame({name: values[:sample] for name, values in columns.items()})
+    if not len(table):
+        return 0
+    return int(len(table.to_json(orient='records').encode()) / len(table) * rows)
@@ -0,0 +1,14 @@
+import numpy as np
+import pandas as pd
+
+
+def build_client_index(df):
+    """Client name -> row position (first occurrence), sorted names and duplicated names"""
+    codes, uniques = pd.factorize(df['Client Name'].astype(str), sort=True)
+    _, first, counts = np.unique(codes, return_index=True, return_counts=True)
+    names = uniques.tolist()
+    return {
+        'positions': dict(zip(names, first.tolist())),
+        'names': names,
+        'duplicates': [name for name, count in zip(names, counts) if count > 1],
+    }
@@ -0,0 +1,178 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from clients import build_client_index
+from ingest import DATA_PATH, SHEET_NAME, read_workbook
+from profiling import PROFILER
+from resultcache import RESULT_CACHE
+from roi import BESS_STEPS, base_roi, bess_roi, compute_bess_grid, compute_opportunities
+
+RELOAD_POLL_SECONDS = float(os.environ.get("RAYS_RELOAD_POLL_SECONDS", 5))
+
+
+def _client_keys(df):
+    """Client Name plus occurrence number, so repeated names still diff row by row"""
+    names = df['Client Name'].astype(str)
+    return pd.MultiIndex.from_arrays([names, names.groupby(names).cumcount()])
+
+
+def _values(series):
+    """Column values without index or category metadata, so compact tables whose category
+    sets differ between loads still compare by value"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+    return series.reset_index(drop=True)
+
+
+def _rows_equal(old, new):
+    """Per-row equality of two aligned frames, treating NaN/None as equal to each other"""
+    equal = np.ones(len(new), dtype=bool)
+    for col in new.columns:
+        a, b = _values(old[col]), _values(new[col])
+        equal &= (a.eq(b) | (a.isna() & b.isna())).to_numpy(dtype=bool, na_value=False)
+    return equal
+
+
+def diff_clients(old, new):
+    """Row-level diff of two client tables keyed on Client Name.
+
+    Returns new-table positions whose derived rows can be copied (with the old
+    positions to copy from), the new-table positions that must be recomputed
+    (changed or added clients) and the number of removed clients.
+    """
+    if list(old.columns) != list(new.columns):
+        return {'kept': np.array([], dtype=int), 'kept_from': np.array([], dtype=int),
+                'recompute': np.arange(len(new)), 'removed': len(old)}
+
+    old_positions = pd.Series(np.arange(len(old)), index=_client_keys(old))
+    matched = old_positions.reindex(_client_keys(new)).to_numpy(dtype=float)
+    present = np.flatnonzero(~np.isnan(matched))
+    matched = matched[present].astype(int)
+    same = _rows_equal(old.iloc[matched], new.iloc[present])
+    return {
+        'kept': present[same],
+        'kept_from': matched[same],
+        'recompute': np.setdiff1d(np.arange(len(new)), present[same]),
+        'removed': len(old) - len(present),
+    }
+
+
+def build_snapshot(df, version):
+    """Client table plus everything the dashboard derives from it"""
+    return {
+        'version': version,
+        'df': df,
+        'index': build_client_index(df),
+        'opportunities': compute_opportunities(df),
+        'base_roi': base_roi(df),
+        'bess_grid': compute_bess_grid(df),
+        'reloaded': {'recomputed': len(df), 'kept': 0, 'removed': 0},
+    }
+
+
+def update_snapshot(old, df, version):
+    """Snapshot for a new client table that only recomputes the opportunity and ROI rows of
+    changed and added clients"""
+    diff = diff_clients(old['df'], df)
+    recompute = diff['recompute']
+    changed = df.iloc[recompute]
+
+    def merge(key, compute):
+        return pd.concat([
+            old[key].iloc[diff['kept_from']].set_axis(diff['kept']),
+            compute(changed).set_axis(recompute),
+        ]).sort_index().set_axis(df.index)
+
+    grid = np.empty((len(df), len(BESS_STEPS)))
+    grid[diff['kept']] = old['bess_grid']['bess_roi'][diff['kept_from']]
+    grid[recompute] = bess_roi(changed, np.asarray(BESS_STEPS))
+
+    return {
+        'version': version,
+        'df': df,
+        'index': build_client_index(df),
+        'opportunities': merge('opportunities', compute_opportunities),
+        'base_roi': merge('base_roi', base_roi),
+        'bess_grid': dict(old['bess_grid'], bess_roi=grid),
+        'reloaded': {'recomputed': len(recompute), 'kept': len(diff['kept']), 'removed': diff['removed']},
+    }
+
+
+class ClientStore:
+    """Process-wide client data that follows the source workbook.
+
+    Readers take store.current() once per rerun and use that snapshot
+    throughout; a reload swaps in a new snapshot instead of mutating the old one.
+    """
+
+    def __init__(self, path=DATA_PATH, sheet_name=SHEET_NAME):
+        self.path = path
+        self.sheet_name = sheet_name
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._mtime_ns = os.stat(path).st_mtime_ns
+        self._failed_mtime_ns = None
+        self.snapshot = build_snapshot(read_workbook(path, sheet_name), version=1)
+        # Versions restart at 1, so results cached for an earlier store are not reusable
+        RESULT_CACHE.clear()
+        PROFILER.count('load_data_cache_miss')
+        self._watcher = None
+
+    def changed(self):
+        try:
+            return os.stat(self.path).st_mtime_ns not in (self._mtime_ns, self._failed_mtime_ns)
+        except OSError:
+            return False
+
+    def refresh(self):
+        """Reload when the workbook's mtime moved; returns True when a new snapshot was published"""
+        if not self.changed():
+            return False
+        with self._lock:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+            if mtime_ns in (self._mtime_ns, self._failed_mtime_ns):
+                return False
+            old = self.snapshot
+            try:
+                df = read_workbook(self.path, self.sheet_name)
+                snapshot = None if df.equals(old['df']) else update_snapshot(old, df, old['version'] + 1)
+            except Exception as e:
+                # Keep serving the last good data whatever went wrong: a half-saved workbook
+                # surfaces as BadZipFile / InvalidFileException, a malformed one as anything
+                self.last_error = f"{type(e).__name__}: {e}"
+                self._failed_mtime_ns = mtime_ns
+                PROFILER.count('reload_error')
+                return False
+            self._mtime_ns = mtime_ns
+            self.last_error = None
+            if snapshot is None:
+                return False
+            self.snapshot = snapshot
+            RESULT_CACHE.invalidate(self.snapshot['version'])
+            return True
+
+    def current(self):
+        PROFILER.count('load_data_cache_miss' if self.refresh() else 'load_data_cache_hit')
+        return self.snapshot
+
+    def start_watcher(self, interval=RELOAD_POLL_SECONDS):
+        """Poll the workbook from a daemon thread so reloads happen off the request path"""
+        if self._watcher is not None:
+            return
+
+        def watch():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.refresh()
+                except Exception as e:
+                    # e.g. the workbook vanished mid-stat; keep watching rather than end the thread
+                    self.last_error = f"{type(e).__name__}: {e}"
+                    PROFILER.count('reload_error')
+
+        self._watcher = threading.Thread(target=watch, name="client-store-watcher", daemon=True)
+        self._watcher.start()
@@ -0,0 +1,124 @@
+"""Hourly (8760-step) load and solar profiles and a vectorized BESS peak-shaving dispatch.
+
+The dispatch rule is daily: the battery is topped up from the grid overnight
+at the off-peak rate, discharges into the 6-8 AM peak, recharges from surplus
+solar during the day and discharges again into the 6-10 PM peak. Starting
+every morning full makes each day independent, so a year is a handful of
+array reductions over (clients, BESS sizes, days, hours) with no loop over time.
+"""
+import numpy as np
+
+from calc import CAPEX, GENERATION, _ratio, bess_mw
+from roi import BESS_STEPS, _column
+
+DAYS = 365
+HOURS = 24
+MORNING_PEAK = slice(6, 8)
+SOLAR_CHARGE = slice(8, 18)
+EVENING_PEAK = slice(18, 22)
+MIDDAY = slice(12, 16)
+BESS_DURATION_HOURS = 4
+ROUND_TRIP_EFFICIENCY = 0.88
+TOD_PEAK_SURCHARGE = 0.20  # fraction of the base tariff
+TOD_OFF_PEAK_REBATE = 0.15
+CHUNK_CLIENTS = 64
+
+
+def _hours(window):
+    return window.stop - window.start
+
+
+def _column_or(x):
+    return np.atleast_1d(np.asarray(x, dtype=float))
+
+
+def hourly_shares(evening_share, morning_share, midday_share):
+    """(clients, 24) fraction of daily consumption per hour from the ToD consumption shares"""
+    evening, morning, midday = (np.clip(_column_or(x), 0, 1) for x in (evening_share, morning_share, midday_share))
+    rest = np.maximum(1 - evening - morning - midday, 0)
+    other_hours = HOURS - _hours(MORNING_PEAK) - _hours(EVENING_PEAK) - _hours(MIDDAY)
+    shares = np.repeat((rest / other_hours)[:, None], HOURS, axis=1)
+    shares[:, MORNING_PEAK] = (morning / _hours(MORNING_PEAK))[:, None]
+    shares[:, EVENING_PEAK] = (evening / _hours(EVENING_PEAK))[:, None]
+    shares[:, MIDDAY] = (midday / _hours(MIDDAY))[:, None]
+    return shares / np.maximum(shares.sum(axis=1, keepdims=True), 1e-12)
+
+
+def load_profile(df):
+    """(clients, DAYS, 24) hourly consumption (kWh); every day follows the client's ToD shape"""
+    annual = _column(df, 'Annual Consumption')
+    midday = _ratio(_column(df, '12-4 PM Consumption'), annual)
+    shares = hourly_shares(_column(df, '6-10 PM Consumption'), _column(df, '6-8 AM Consumption'), midday)
+    return np.broadcast_to((annual[:, None] / DAYS * shares)[:, None, :], (len(df), DAYS, HOURS))
+
+
+def solar_shape(generation=GENERATION):
+    """(DAYS, 24) output of 1 kW AC, a daylight half-sine with a spring peak, summing to the
+    annual solar yield in `generation` (kWh per MW AC)"""
+    hour = np.arange(HOURS) + 0.5
+    daily = np.where((hour > 6) & (hour < 18), np.sin(np.pi * (hour - 6) / 12), 0)
+    season = 1 + 0.15 * np.cos(2 * np.pi * (np.arange(DAYS) - 110) / DAYS)
+    shape = season[:, None] * daily
+    return shape * (generation['solar'] / 1000 / shape.sum())
+
+
+def solar_profile(df, generation=GENERATION):
+    """(clients, DAYS, 24) hourly generation (kWh) of the installed AC capacity (MW)"""
+    return _column(df, 'Installed Solar Capacity (AC)')[:, None, None] * 1000 * solar_shape(generation)
+
+
+def _window_total(flow, power, window):
+    """Daily energy (clients, sizes, DAYS) moved in an hour window at up to `power` kW per hour"""
+    return np.minimum(flow[:, None, :, window], power).sum(axis=-1)
+
+
+def simulate_dispatch(load, solar, solar_dc, base_tariff, bess_pct=BESS_STEPS):
+    """Annual dispatch of every client x BESS size.
+
+    load and solar are (clients, DAYS, 24) kWh, solar_dc (MW) and base_tariff
+    are per client and bess_pct lists sizes as % of solar DC. Returns annual
+    kWh totals and savings (Rs) of shape (clients, sizes).
+    """
+    power = bess_mw(_column_or(solar_dc)[:, None], bess_pct) * 1000  # kW
+    capacity = power[:, :, None] * BESS_DURATION_HOURS
+    power = power[:, :, None, None].astype(np.float32)
+    net_load = np.maximum(load - solar, 0).astype(np.float32)
+    surplus = np.maximum(solar - load, 0).astype(np.float32)
+
+    # Flows are non-negative, so a running total capped at the battery's energy
+    # ends at min(window total, energy): only daily window totals are needed.
+    morning = np.minimum(_window_total(net_load, power, MORNING_PEAK), capacity)
+    charged = np.minimum(_window_total(surplus, power, SOLAR_CHARGE) * ROUND_TRIP_EFFICIENCY, morning)
+    evening = np.minimum(_window_total(net_load, power, EVENING_PEAK), capacity - morning + charged)
+    # Overnight top-up back to full for the next morning (the year wraps around)
+    grid_charged = (morning - charged + evening).sum(axis=-1) / ROUND_TRIP_EFFICIENCY
+
+    peak_shaved = (morning + evening).sum(axis=-1)
+    tariff = _column_or(base_tariff)[:, None]
+    return {
+        'bess_pct': np.asarray(bess_pct),
+        'peak_shaved_kwh': peak_shaved,
+        'solar_shifted_kwh': charged.sum(axis=-1) / ROUND_TRIP_EFFICIENCY,
+        'grid_charged_kwh': grid_charged,
+        'savings': (peak_shaved * tariff * (1 + TOD_PEAK_SURCHARGE)
+                    - grid_charged * tariff * (1 - TOD_OFF_PEAK_REBATE)),
+    }
+
+
+def dispatch_grid(df, bess_pct=BESS_STEPS, chunk_clients=CHUNK_CLIENTS, capex=CAPEX, generation=GENERATION):
+    """simulate_dispatch over a client table, CHUNK_CLIENTS at a time to bound memory,
+    plus BESS cost and dispatch ROI (%) per client x size"""
+    parts = []
+    for start in range(0, len(df), chunk_clients):
+        chunk = df.iloc[start:start + chunk_clients]
+        parts.append(simulate_dispatch(load_profile(chunk), solar_profile(chunk, generation),
+                                       _column(chunk, 'Installed Solar Capacity (DC)'),
+                                       _column(chunk, 'Base Tariff'), bess_pct))
+    steps = np.asarray(bess_pct)
+    grid = {'bess_pct': steps}
+    for key in ('peak_shaved_kwh', 'solar_shifted_kwh', 'grid_charged_kwh', 'savings'):
+        grid[key] = (np.concatenate([part[key] for part in parts]) if parts
+                     else np.empty((0, len(steps))))
+    grid['cost'] = bess_mw(_column(df, 'Installed Solar Capacity (DC)')[:, None], steps) * capex['bess']
+    grid['roi'] = _ratio(grid['savings'], grid['cost']) * 100
+    return grid
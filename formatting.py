@@ -0,0 +1,97 @@
+import math
+import re
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+import pandas as pd
+
+# Values at or above this would overflow int64 once scaled to paise
+_VECTOR_LIMIT = 1e16
+_LAKH_GROUPS = re.compile(r'(\d)(?=(\d{2})+$)')
+_SPACE, _COMMA, _MINUS, _POINT, _ZERO = (ord(c) for c in ' ,-.0')
+
+
+def format_indian(t):
+    """Indian number formatting with commas (e.g., 2,42,30,450)"""
+    if t is None:
+        return "N/A"
+    try:
+        value = float(t)
+    except (TypeError, ValueError):
+        return str(t)
+    if not math.isfinite(value):
+        return "N/A"
+
+    # Halves round up (0.125 -> 0.13), as currency is expected to, not to even
+    paise = int(Decimal(abs(value) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    whole, frac = divmod(paise, 100)
+    digits = str(whole)
+    if len(digits) > 3:
+        digits = _LAKH_GROUPS.sub(r'\1,', digits[:-3]) + "," + digits[-3:]
+    sign = "-" if value < 0 and (whole or frac) else ""
+    suffix = "." + f"{frac:02d}".rstrip('0') if frac else ""
+    return sign + digits + suffix
+
+
+def _render(numeric):
+    """Format finite floats below _VECTOR_LIMIT on one fixed-width grid of UCS-4 code points"""
+    # Round halves up like format_indian; floor(x + 0.5) would misround above 2**52
+    scaled = np.abs(numeric) * 100
+    paise = np.floor(scaled)
+    paise = (paise + (scaled - paise >= 0.5)).astype(np.int64)
+    whole, frac = np.divmod(paise, 100)
+    ndigits = np.ones(len(whole), dtype=np.int64)
+    for power in range(1, 17):
+        ndigits += whole >= 10**power
+    width = int(ndigits.max())
+
+    # Spare column for the sign, one column per digit (most significant first) with a
+    # comma after the thousands digit and every second digit above it, then '.dd'.
+    # Rows are filled column-major and transposed once at the end.
+    digit_col = np.zeros(width, dtype=np.int64)
+    comma_cols = []
+    col = 1
+    for power in range(width - 1, -1, -1):
+        digit_col[power] = col
+        col += 1
+        if power >= 3 and power % 2 == 1:
+            comma_cols.append((power, col))
+            col += 1
+    grid = np.empty((col + 3, len(whole)), dtype=np.uint32)
+    grid[0] = _SPACE
+
+    rest = whole.copy()
+    for power in range(width):
+        grid[digit_col[power]] = np.where(ndigits > power, _ZERO + rest % 10, _SPACE)
+        rest //= 10
+    for power, comma in comma_cols:
+        grid[comma] = np.where(ndigits > power, _COMMA, _SPACE)
+    grid[col] = np.where(frac > 0, _POINT, _SPACE)
+    grid[col + 1] = np.where(frac > 0, _ZERO + frac // 10, _SPACE)
+    grid[col + 2] = np.where(frac % 10 > 0, _ZERO + frac % 10, _SPACE)
+    grid = np.ascontiguousarray(grid.T)
+
+    negative = np.flatnonzero((numeric < 0) & (paise > 0))
+    grid[negative, digit_col[ndigits[negative] - 1] - 1] = _MINUS
+    return np.strings.strip(grid.view(f'<U{grid.shape[1]}').ravel())
+
+
+def format_indian_batch(values):
+    """format_indian over a whole Series/array in one vectorized pass"""
+    is_series = isinstance(values, pd.Series)
+    original = values if is_series else pd.Series(np.asarray(values, dtype=object).ravel())
+    numeric = pd.to_numeric(original, errors='coerce').to_numpy(dtype=float)
+    result = np.full(len(numeric), "N/A", dtype=object)
+
+    vector = np.isfinite(numeric) & (np.abs(numeric) < _VECTOR_LIMIT)
+    if vector.any():
+        result[vector] = _render(numeric[vector])
+
+    # Huge magnitudes and non-numeric entries take the scalar path
+    rest = ~vector & ~original.isna().to_numpy()
+    for i in np.flatnonzero(rest):
+        result[i] = format_indian(original.iloc[i])
+
+    if is_series:
+        return pd.Series(result, index=values.index, name=values.name, dtype=object)
+    return result
@@ -0,0 +1,361 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pyarrow as pa
+
+from profiling import PROFILER
+
+DATA_PATH = "D-V4.xlsx"
+SHEET_NAME = "Sheet1"
+CACHE_DIR = os.environ.get("RAYS_CACHE_DIR", ".cache")
+CHUNK_ROWS = 50_000
+# Part of every cache file name: bump when clean_frame, iter_chunks or compact_frame change
+# what gets stored, so caches written by older code are rebuilt instead of read
+INGEST_VERSION = 2
+# Compact mode: categoricals, downcast numbers and a shared memory-mapped Arrow table
+COMPACT = os.environ.get("RAYS_COMPACT", "0") == "1"
+# Downcast a float column to float32 only if no value moves by more than half a displayed digit
+DISPLAY_DECIMALS = 2
+# Store text as a categorical when at most this share of its values are distinct
+CATEGORY_MAX_UNIQUE = 0.5
+REQUIRED_COLUMNS = ['Client Name', 'Contract Demand (mVA)', 'Sanctioned Load (mVA)',
+                    'Annual Consumption', 'Base Tariff']
+# Required columns the calculations read as numbers: text in them is always an error
+NUMERIC_COLUMNS = REQUIRED_COLUMNS[1:]
+PERCENT_COLS = ['Average Load Factor', '6-10 PM Consumption', '6-8 AM Consumption', 'Percent Green Consumption']
+
+
+def clean_frame(df):
+    """Strip header whitespace and turn percent columns into floats"""
+    df.columns = df.columns.str.strip()
+    for col in PERCENT_COLS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col].astype(str).str.replace('%', ''), errors='coerce')
+    return df
+
+
+def check_columns(columns, source):
+    """Fail before any rows are read when a sheet lacks a column the calculations need"""
+    missing = [col for col in REQUIRED_COLUMNS if col not in set(columns)]
+    if missing:
+        raise ValueError(f"{source} is missing required columns: {', '.join(missing)}")
+
+
+class TextColumnError(ValueError):
+    """Columns read as numeric from the first chunk hold text further down"""
+
+    def __init__(self, message, columns):
+        super().__init__(message)
+        self.columns = columns
+
+
+def _xlsx_chunks(path, sheet_names, chunk_rows):
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    first_columns = None
+    try:
+        for sheet_name in sheet_names or workbook.sheetnames:
+            rows = workbook[sheet_name].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                continue
+            # Header-less columns are formatting spill-over, not data
+            keep = [i for i, h in enumerate(header) if h is not None]
+            columns = pd.Index([str(header[i]) for i in keep]).str.strip()
+            source = f"{path} [{sheet_name}]"
+            check_columns(columns, source)
+            if first_columns is None:
+                first_columns = columns
+            elif set(columns) != set(first_columns):
+                # Every chunk takes the first sheet's columns; anything else would be dropped or blanked
+                extra = [col for col in columns if col not in first_columns]
+                missing = [col for col in first_columns if col not in columns]
+                raise ValueError(f"{source} has different columns from the first sheet "
+                                 f"(extra: {', '.join(extra) or 'none'}; missing: {', '.join(missing) or 'none'})")
+            batch = []
+            for row in rows:
+                row = [row[i] for i in keep]
+                if any(value is not None for value in row):
+                    batch.append(row)
+                if len(batch) == chunk_rows:
+                    yield source, pd.DataFrame(batch, columns=columns)
+                    batch = []
+            if batch:
+                yield source, pd.DataFrame(batch, columns=columns)
+    finally:
+        workbook.close()
+
+
+def _csv_chunks(path, chunk_rows):
+    for i, chunk in enumerate(pd.read_csv(path, chunksize=chunk_rows)):
+        chunk.columns = chunk.columns.str.strip()
+        if i == 0:
+            check_columns(chunk.columns, path)
+        yield path, chunk
+
+
+def _non_numeric(values):
+    """Mask of values that are present but do not parse as numbers"""
+    return pd.to_numeric(values, errors='coerce').isna() & values.notna()
+
+
+def iter_chunks(path, sheet_names=None, chunk_rows=CHUNK_ROWS, text_columns=()):
+    """Cleaned row chunks from a CSV or from each requested sheet (default: all) of a workbook.
+
+    Every sheet must have the first sheet's columns; text columns are `text_columns`
+    plus those holding any non-numeric value in the first chunk, everything else is
+    converted to float64 so chunks share one Arrow schema. Text turning up later in
+    a numeric column raises TextColumnError naming the columns (workbook_store then
+    reads the file again with them as text) rather than becoming a silent NaN; in
+    NUMERIC_COLUMNS it is a plain ValueError wherever it appears.
+    """
+    if path.lower().endswith('.csv'):
+        chunks = _csv_chunks(path, chunk_rows)
+    else:
+        chunks = _xlsx_chunks(path, sheet_names, chunk_rows)
+
+    columns = source = None
+    for chunk_source, chunk in chunks:
+        chunk = clean_frame(chunk)
+        if columns is None:
+            columns = chunk.columns
+            text_columns = ({'Client Name'} | set(text_columns) | {
+                col for col in columns if col not in PERCENT_COLS and _non_numeric(chunk[col]).any()
+            }) - set(NUMERIC_COLUMNS)
+            first_rows = len(chunk)
+        if chunk_source != source:
+            source, rows = chunk_source, 0
+        chunk = chunk.reindex(columns=columns)
+        late = {}
+        for col in columns:
+            if col in text_columns:
+                chunk[col] = chunk[col].astype('str').where(chunk[col].notna(), None)
+                continue
+            lost = _non_numeric(chunk[col]).to_numpy()
+            if lost.any():
+                row = int(lost.argmax())
+                found = f"data row {rows + row + 1:,} holds {chunk[col].iloc[row]!r}"
+                if col in NUMERIC_COLUMNS:
+                    raise ValueError(f"{source}: column '{col}' must be numeric but {found}")
+                late[col] = found
+                continue
+            chunk[col] = pd.to_numeric(chunk[col], errors='coerce').astype('float64')
+        if late:
+            details = ', '.join(f"'{col}' ({found})" for col, found in late.items())
+            raise TextColumnError(f"{source}: numeric or blank in the first {first_rows:,} rows but holding text "
+                                  f"later: {details}", list(late))
+        rows += len(chunk)
+        yield chunk
+
+
+def write_store(chunks, path):
+    """Append chunks to an Arrow IPC file, one record batch per chunk, then publish it atomically"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                schema = table.schema.remove_metadata()
+                writer = pa.ipc.new_file(tmp, schema)
+            writer.write_table(table.cast(schema))
+        if writer is None:
+            raise ValueError(f"no rows to store in {path}")
+        writer.close()
+        writer = None
+        os.replace(tmp, path)
+    finally:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def file_sha256(path):
+    """Content hash of the source workbook"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _atomic_write(path, write):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _cache_prefix(path):
+    """Cache file name prefix of a workbook: its name plus a hash of its absolute path, so
+    workbooks with the same name in different folders keep separate caches"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return f"{stem}-{hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:8]}"
+
+
+def source_key(path):
+    """mtime/size/sha256 of the workbook; the hash is only recomputed when mtime or size moved"""
+    stat = os.stat(path)
+    meta_path = os.path.join(CACHE_DIR, _cache_prefix(path) + ".meta.json")
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta['mtime_ns'] == stat.st_mtime_ns and meta['size'] == stat.st_size:
+            return meta
+    except (OSError, ValueError, KeyError):
+        pass
+    meta = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': file_sha256(path)}
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    def write(tmp):
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+    _atomic_write(meta_path, write)
+    return meta
+
+
+def cache_path(path, sheet_name, sha256):
+    return os.path.join(CACHE_DIR, f"{_cache_prefix(path)}-{sheet_name}-v{INGEST_VERSION}-{sha256[:16]}.arrow")
+
+
+def _drop_stale(path, sheet_name, keep):
+    """Remove this workbook and sheet's other cache files (older contents or ingest versions)"""
+    prefix = f"{_cache_prefix(path)}-{sheet_name}-"
+    for name in os.listdir(CACHE_DIR):
+        full = os.path.join(CACHE_DIR, name)
+        if name.startswith(prefix) and name.endswith(".arrow") and full != keep:
+            try:
+                os.remove(full)
+            except OSError:
+                pass
+
+
+def read_cached(path):
+    """Memory-map a cached Arrow file back into a DataFrame"""
+    with pa.memory_map(path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas()
+
+
+def iter_cached(path, columns=None):
+    """Record batches of a cached Arrow file as DataFrames indexed by row position"""
+    with pa.memory_map(path, 'r') as source:
+        reader = pa.ipc.open_file(source)
+        start = 0
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if columns is not None:
+                batch = batch.select(columns)
+            chunk = batch.to_pandas()
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+            start += len(chunk)
+            yield chunk
+
+
+def _fits_float32(values):
+    error = np.abs(values.astype(np.float32).astype(np.float64) - values)
+    return bool(np.nanmax(error, initial=0) <= 0.5 * 10 ** -DISPLAY_DECIMALS)
+
+
+def compact_frame(df):
+    """Copy of a client table with repeated text as categoricals, whole-number columns as the
+    smallest integer type and other floats as float32 where that keeps DISPLAY_DECIMALS"""
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_float_dtype(series):
+            values = series.to_numpy(dtype=float)
+            finite = values[~np.isnan(values)]
+            if len(finite) == len(values) and np.array_equal(finite, np.round(finite)):
+                columns[col] = pd.to_numeric(series, downcast='integer')
+            elif _fits_float32(values):
+                columns[col] = series.astype(np.float32)
+            else:
+                columns[col] = series
+        elif series.nunique() <= CATEGORY_MAX_UNIQUE * len(series):
+            columns[col] = series.astype('category')
+        else:
+            columns[col] = series
+    return pd.DataFrame(columns, index=df.index)
+
+
+def compact_store(path):
+    """Path of the compact Arrow copy of a cached table, writing it on first use; its name
+    extends the cache name, so it carries the same INGEST_VERSION and content hash"""
+    compact = path[:-len(".arrow")] + ".compact.arrow"
+    if not os.path.exists(compact):
+        write_store([compact_frame(read_cached(path))], compact)
+    return compact
+
+
+def _arrow_dtype(arrow_type):
+    # Dictionary columns become pandas categoricals (only their small codes are copied)
+    return None if pa.types.is_dictionary(arrow_type) else pd.ArrowDtype(arrow_type)
+
+
+def read_shared(path):
+    """Read-only DataFrame over a memory-mapped Arrow file without copying the column buffers,
+    so every process mapping the same file shares one copy in the OS page cache"""
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    return table.to_pandas(types_mapper=_arrow_dtype)
+
+
+def memory_report(before, after):
+    """Per-column dtype and bytes of two versions of a table, with a total row.
+
+    Arrow-backed columns of a read_shared table live in the shared memory map,
+    not in the process's private memory.
+    """
+    report = pd.DataFrame({
+        'dtype before': before.dtypes.astype(str),
+        'dtype after': after.dtypes.astype(str).reindex(before.columns),
+        'bytes before': before.memory_usage(index=False, deep=True),
+        'bytes after': after.memory_usage(index=False, deep=True).reindex(before.columns),
+    })
+    report['arrow-backed'] = [isinstance(dtype, pd.ArrowDtype) for dtype in after.dtypes.reindex(before.columns)]
+    report.loc['Total'] = ['', '', report['bytes before'].sum(), report['bytes after'].sum(),
+                           report['arrow-backed'].all()]
+    report['saved (%)'] = (1 - report['bytes after'] / report['bytes before']) * 100
+    return report
+
+
+def workbook_store(path=DATA_PATH, sheet_name=SHEET_NAME, chunk_rows=CHUNK_ROWS):
+    """Path of the Arrow cache for a workbook, streaming the workbook into it on a miss.
+
+    Parsing goes chunk by chunk, so it never holds the whole sheet in memory; a column
+    that turns out to hold text after the first chunk costs one more pass over the
+    file. sheet_name=None takes every sheet.
+    """
+    cached = cache_path(path, sheet_name or "all", source_key(path)['sha256'])
+    if os.path.exists(cached):
+        PROFILER.count('workbook_cache_hit')
+        return cached
+
+    PROFILER.count('workbook_cache_miss')
+    with PROFILER.stage('parse_workbook'):
+        sheets = [sheet_name] if sheet_name else None
+        text_columns = set()
+        while True:
+            try:
+                write_store(iter_chunks(path, sheets, chunk_rows, text_columns), cached)
+                break
+            except TextColumnError as e:
+                # Nothing is published until write_store finishes: parse again with the columns as text
+                PROFILER.count('workbook_reparse')
+                text_columns.update(e.columns)
+    _drop_stale(path, sheet_name or "all", cached)
+    return cached
+
+
+def read_workbook(path=DATA_PATH, sheet_name=SHEET_NAME, chunk_rows=CHUNK_ROWS, compact=COMPACT):
+    """Cleaned client table, memory-mapped from the on-disk Arrow cache.
+
+    compact=True returns the compact table as a read-only view over a shared
+    memory map instead of a private copy.
+    """
+    cached = workbook_store(path, sheet_name, chunk_rows)
+    if compact:
+        return read_shared(compact_store(cached))
+    return read_cached(cached)
@@ -1,286 +1,380 @@
+import time
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import altair as alt
 
-def format_indian(t):
-    """Indian number formatting with commas (e.g., 2,42,30,450)"""
-    try:
-        t = float(t)
-        if t.is_integer():
-            t = int(t)
-        
-        s = str(t).split('.')
-        if len(s) == 1:
-            # Integer formatting
-            s = s[0]
-            if len(s) > 3:
-                last_three = s[-3:]
-                other_numbers = s[:-3]
-                res = ""
-                while len(other_numbers) > 2:
-                    res = "," + other_numbers[-2:] + res
-                    other_numbers = other_numbers[:-2]
-                if other_numbers:
-                    res = other_numbers + res
-                return res + "," + last_three
-            return s
-        else:
-            # Float formatting
-            before_decimal = s[0]
-            after_decimal = s[1][:2]  # Take 2 decimal places
-            if len(before_decimal) > 3:
-                last_three = before_decimal[-3:]
-                other_numbers = before_decimal[:-3]
-                res = ""
-                while len(other_numbers) > 2:
-                    res = "," + other_numbers[-2:] + res
-                    other_numbers = other_numbers[:-2]
-                if other_numbers:
-                    res = other_numbers + res
-                return res + "," + last_three + "." + after_decimal
-            return before_decimal + "." + after_decimal
-    except:
-        return str(t)
-
-@st.cache_data
-def load_data():
-    data_path = "D-V4.xlsx"
-    sheet_name = "Sheet1"
-    df = pd.read_excel(data_path, sheet_name=sheet_name)
-    df.columns = df.columns.str.strip()
-
-    percent_cols = ['Average Load Factor', '6-10 PM Consumption', '6-8 AM Consumption', 'Percent Green Consumption']
-    for col in percent_cols:
-        if col in df.columns:
-            df[col] = df[col].astype(str).str.replace('%', '').astype(float)
-    return df
+from calc import waiver_percentage
+from chartdata import payload_bytes, portfolio_chart_data, raw_payload_bytes
+from datastore import RELOAD_POLL_SECONDS, ClientStore
+from dispatch import dispatch_grid
+from formatting import format_indian
+from ingest import DATA_PATH, SHEET_NAME
+from montecarlo import DEFAULT_ASSUMPTIONS, client_economics, npv_histogram, simulate, summarize
+from profiling import PROFILER
+from ranking import METRICS, ROI_METRICS, build_ranking, query, ranking_table
+from report import (OPPORTUNITY_FORMATTERS, VALUE_FORMATTERS, bess_sensitivity_data,
+                    client_info_tables, dispatch_sensitivity_data, opportunities_table, render_table,
+                    roi_chart_data)
+from resultcache import RESULT_CACHE
+from roi import BESS_STEPS, ROI_OPTIONS, grid_roi_row
+from scenarios import (ScenarioResults, load_scenarios, parse_scenarios, scenario_comparison, scenario_hash,
+                       with_scenario_tariff)
+
+@st.cache_resource
+def load_store():
+    """Process-wide client data, watched so workbook edits reload incrementally"""
+    store = ClientStore(DATA_PATH, SHEET_NAME)
+    store.start_watcher(RELOAD_POLL_SECONDS)
+    return store
+
+@st.cache_resource
+def scenario_results():
+    """Process-wide memo of scenario ROI tables, shared by every session"""
+    return ScenarioResults()
+
+def choose_scenario():
+    """Sidebar scenario picker: the base case, RAYS_SCENARIOS and any uploaded scenario files"""
+    scenarios = load_scenarios()
+    with st.sidebar.expander("\U0001F9EE Assumption Scenarios"):
+        upload = st.file_uploader("Upload scenarios (JSON or CSV)", type=['json', 'csv'])
+        if upload is not None:
+            try:
+                names = {s['name'] for s in scenarios}
+                scenarios += [s for s in parse_scenarios(upload.getvalue(), upload.name) if s['name'] not in names]
+            except ValueError as e:
+                st.error(str(e))
+    if len(scenarios) == 1:
+        return scenarios, scenarios[0]
+    chosen = st.sidebar.selectbox("Scenario", [s['name'] for s in scenarios])
+    return scenarios, next(s for s in scenarios if s['name'] == chosen)
+
+@st.fragment(run_every=RELOAD_POLL_SECONDS)
+def follow_reloads(store):
+    """Rerun open sessions once the store has published newer data"""
+    if st.session_state.setdefault('data_version', store.snapshot['version']) != store.snapshot['version']:
+        st.session_state['data_version'] = store.snapshot['version']
+        st.rerun(scope="app")
+
+def profiling_panel():
+    """Debug sidebar panel (open the app with ?debug=1) with per-stage timings and cache counters"""
+    summary = PROFILER.summary()
+    with st.sidebar.expander("\U0001F6E0 Profiling", expanded=True):
+        stages = pd.DataFrame.from_dict(summary['stages'], orient='index')
+        if not stages.empty:
+            st.dataframe(stages.sort_values('p95_ms', ascending=False).round(2))
+        st.write(summary['events'])
+        st.caption("Result cache")
+        st.write(RESULT_CACHE.stats())
+        st.download_button("Download JSON", PROFILER.to_json(), "profile.json", "application/json")
+        st.download_button("Download Prometheus text", PROFILER.to_prometheus(), "profile.prom", "text/plain")
+        if st.button("Reset counters"):
+            PROFILER.reset()
+
+def lifetime_assumptions():
+    """Sidebar inputs for the Monte Carlo lifetime economics"""
+    with st.sidebar.expander("\U0001F3B2 Lifetime Assumptions"):
+        return {
+            'discount_rate': st.number_input("Discount rate (%)", 0.0, 30.0,
+                                             DEFAULT_ASSUMPTIONS['discount_rate'] * 100, 0.5) / 100,
+            'tariff_escalation': st.number_input("Tariff escalation (%/yr)", -5.0, 15.0,
+                                                 DEFAULT_ASSUMPTIONS['tariff_escalation'] * 100, 0.5) / 100,
+            'capex_sd': st.number_input("Capex uncertainty (±%)", 0.0, 50.0,
+                                        DEFAULT_ASSUMPTIONS['capex_sd'] * 100, 1.0) / 100,
+            'years': st.slider("Project life (years)", 5, 40, DEFAULT_ASSUMPTIONS['years']),
+            'scenarios': st.select_slider("Scenarios", [500, 1000, 2000, 5000], DEFAULT_ASSUMPTIONS['scenarios']),
+        }
+
+def overview_html(selected):
+    """Rendered load and solar tables for one client"""
+    load_info, solar_info = client_info_tables(selected)
+    with PROFILER.stage('render_tables'):
+        return render_table(load_info, VALUE_FORMATTERS), render_table(solar_info, VALUE_FORMATTERS)
+
+def opportunities_html(selected):
+    """Rendered opportunities table for one client"""
+    table = opportunities_table(selected)
+    with PROFILER.stage('render_tables'):
+        return render_table(table, OPPORTUNITY_FORMATTERS)
+
+def roi_views(scenario_tables, position, bess_pct):
+    """ROI row, bar chart data and BESS sensitivity for one client under one scenario"""
+    base_table, bess_grid = scenario_tables
+    roi_row = grid_roi_row(base_table, bess_grid, position, bess_pct)
+    return roi_row, roi_chart_data(roi_row, bess_pct), bess_sensitivity_data(bess_grid, position)
+
+def lifetime_views(client_rows, bess_pct, scenario, assumptions):
+    """Monte Carlo summary table and NPV histogram for one client"""
+    cost, savings = client_economics(client_rows, bess_pct, scenario['capex'], scenario['generation'])
+    simulated = {key: value[0] for key, value in simulate(cost, savings, assumptions).items()}
+    return summarize(simulated), npv_histogram(simulated)
 
 def main():
-    df = load_data()
-    client = st.sidebar.selectbox("Select Client", df['Client Name'].unique())
-    selected = df[df['Client Name'] == client].iloc[0]
+    page = st.navigation([
+        st.Page(render_page, title="Client Overview", icon="\U0001F4CA", default=True),
+        st.Page(portfolio_page, title="Portfolio Ranking", icon="\U0001F3C6", url_path="portfolio"),
+    ])
+    with PROFILER.stage('rerun'):
+        page.run()
+    if st.query_params.get('debug') == '1':
+        profiling_panel()
+
+def current_data():
+    """This rerun's data snapshot, following reloads and surfacing reload failures"""
+    with PROFILER.stage('load_data'):
+        store = load_store()
+        data = store.current()
+    st.session_state['data_version'] = data['version']
+    follow_reloads(store)
+    if store.last_error:
+        st.sidebar.warning(f"Workbook reload failed, showing the last good data. {store.last_error}")
+    return data
+
+def portfolio_page():
+    data = current_data()
+    st.title("\U0001F3C6 Portfolio Ranking")
+    bess_pct = st.sidebar.select_slider("BESS Size for BESS ROI (% of Solar)", options=BESS_STEPS, value=10)
+    scenarios, scenario = choose_scenario()
+    scenario_key = scenario_hash(scenario)
+    with PROFILER.stage('ranking_build'):
+        ranking = RESULT_CACHE.get_or_compute(
+            (data['version'], 'ranking', bess_pct, scenario_key),
+            lambda: build_ranking(data['df'], data['opportunities'],
+                                  *scenario_results().get(data, [scenario])[scenario_key], bess_pct))
+
+    col1, col2, col3 = st.columns([3, 1, 2])
+    metric = col1.selectbox("Rank by", METRICS, index=METRICS.index('Available CD AC'))
+    top_n = col2.number_input("Top N", min_value=1, max_value=1000, value=50, step=10)
+    min_value = col3.number_input("Minimum value (blank for none)", value=None, placeholder="No minimum")
+    col1, col2 = st.columns(2)
+    levels = [level for level in ranking['voltage_levels'].tolist() if level == level]
+    voltage_levels = col1.multiselect("Voltage level (kV)", levels, format_func=lambda level: f"{level:g}")
+    best_options = col2.multiselect("Best option", ROI_OPTIONS)
+
+    with PROFILER.stage('ranking_query'):
+        positions, matching = query(ranking, metric, int(top_n), min_value, voltage_levels, best_options)
+        table = ranking_table(ranking, positions, metric)
+    st.caption(f"{matching:,} of {len(ranking['names']):,} clients match; showing the top {len(positions):,} "
+               f"by {metric} (BESS at {bess_pct}% of solar).")
+    st.dataframe(table.round(2), hide_index=True, width="stretch")
+
+    charts = st.expander("\U0001F4CA Portfolio Charts", key='portfolio_charts', on_change="rerun")
+    if charts.open:
+        with charts:
+            portfolio_charts(data, ranking, (data['version'], 'portfolio_charts', bess_pct, scenario_key))
+
+def timed_chart(chart, measurements):
+    """st.altair_chart with its Vega-Lite payload size and server-side render time recorded"""
+    started = time.perf_counter()
+    st.altair_chart(chart, width="stretch")
+    seconds = time.perf_counter() - started
+    PROFILER.record('portfolio_chart_render', seconds)
+    measurements.append((payload_bytes(chart), seconds))
+
+def portfolio_charts(data, ranking, cache_key):
+    """ROI, headroom and green-share charts drawn from server-side aggregates"""
+    import altair as alt
+
+    with PROFILER.stage('portfolio_aggregate'):
+        started = time.perf_counter()
+        charts = RESULT_CACHE.get_or_compute(cache_key, lambda: portfolio_chart_data(data['df'], ranking))
+        aggregate_ms = (time.perf_counter() - started) * 1000
+    measurements = []
+
+    option = st.selectbox("ROI distribution for", ROI_OPTIONS)
+    histogram = charts['roi_histograms'][charts['roi_histograms']['Option'] == option]
+    timed_chart(alt.Chart(histogram).mark_bar().encode(
+        x=alt.X('ROI from (%)', bin='binned', title=f'{option} ROI (%)'),
+        x2='ROI to (%)',
+        y='Clients',
+        tooltip=['ROI from (%)', 'ROI to (%)', 'Clients']
+    ).properties(height=250), measurements)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Headroom by Voltage Level")
+        headroom = charts['headroom_by_voltage']
+        timed_chart(alt.Chart(headroom).mark_bar().encode(
+            x=alt.X('Voltage Level (kV):O'),
+            y='Total Available CD AC',
+            tooltip=list(headroom.columns)
+        ).properties(height=250), measurements)
+    with col2:
+        st.subheader("Green Share")
+        green = charts['green_share']
+        timed_chart(alt.Chart(green).mark_bar().encode(
+            x=alt.X('Green share from (%)', bin='binned', title='Percent Green Consumption (%)'),
+            x2='Green share to (%)',
+            y='Clients',
+            tooltip=list(green.columns)
+        ).properties(height=250), measurements)
+
+    raw = raw_payload_bytes({
+        **{metric: ranking['values'][metric] for metric in ROI_METRICS[:-1] + ['Available CD AC', 'Available SL AC']},
+        'Voltage Level': ranking['voltage'],
+        'Percent Green Consumption': data['df']['Percent Green Consumption'].to_numpy(dtype=float)
+        if 'Percent Green Consumption' in data['df'].columns else np.zeros(len(data['df'])),
+    })
+    sent = sum(size for size, _ in measurements)
+    st.caption(f"Chart payloads {sent / 1024:,.1f} KB (about {raw / 1024 / 1024:,.1f} MB as raw client rows); "
+               f"aggregation {aggregate_ms:.1f} ms, rendering {sum(s for _, s in measurements) * 1000:.1f} ms.")
+
+def opportunities_section(data, position, bess_pct, scenarios, scenario, assumptions):
+    with PROFILER.stage('opportunities'):
+        html = RESULT_CACHE.get_or_compute((data['version'], 'opportunities', position),
+                                           lambda: opportunities_html(data['df'].iloc[position]))
+    st.markdown(html, unsafe_allow_html=True)
+
+def roi_section(data, position, bess_pct, scenarios, scenario, assumptions):
+    import altair as alt
+
+    with PROFILER.stage('scenarios'):
+        results = scenario_results().get(data, scenarios)
+    scenario_key = scenario_hash(scenario)
+    with PROFILER.stage('roi'):
+        roi_row, roi_data, sensitivity = RESULT_CACHE.get_or_compute(
+            (data['version'], 'roi', position, bess_pct, scenario_key),
+            lambda: roi_views(results[scenario_key], position, bess_pct))
+
+    # Display Results
+    with PROFILER.stage('chart'):
+        st.altair_chart(alt.Chart(roi_data).mark_bar().encode(
+            x=alt.X('Option', sort=None),
+            y='ROI (%)',
+            color='Option'
+        ).properties(height=400), width="stretch")
+
+    best_option = roi_data['Option'][ROI_OPTIONS.index(roi_row['Best Option'])]
+    st.success(f"Recommended Option: {best_option} (ROI: {roi_row['Best ROI (%)']:.2f}%)")
+    if len(scenarios) > 1:
+        with st.expander(f"Compare {len(scenarios)} scenarios"):
+            st.dataframe(scenario_comparison(results, scenarios, position, bess_pct).round(2),
+                         hide_index=True, width="stretch")
+
+    # BESS Sensitivity
+    st.subheader("\U0001F50B BESS Size Sensitivity")
+    with PROFILER.stage('chart'):
+        line = alt.Chart(sensitivity).mark_line(point=True).encode(
+            x=alt.X('BESS Size (% of Solar)', scale=alt.Scale(domain=[0, 100])),
+            y='BESS ROI (%)',
+            tooltip=['BESS Size (% of Solar)', 'Waiver (%)', 'BESS ROI (%)']
+        )
+        marker = alt.Chart(sensitivity[sensitivity['BESS Size (% of Solar)'] == bess_pct]).mark_rule(
+            color='#e67300', strokeDash=[4, 4]
+        ).encode(x='BESS Size (% of Solar)')
+        st.altair_chart((line + marker).properties(height=300), width="stretch")
+    optimum = sensitivity.loc[sensitivity['BESS ROI (%)'].idxmax()]
+    st.caption(f"Highest BESS ROI at {optimum['BESS Size (% of Solar)']:.0f}% of solar "
+               f"({optimum['BESS ROI (%)']:.2f}%, waiver {optimum['Waiver (%)']:.0f}%)")
+
+def dispatch_section(data, position, bess_pct, scenarios, scenario, assumptions):
+    import altair as alt
 
-    def get_percentage(value):
-        try:
-            return float(str(value).replace('%', ''))
-        except:
-            return 0.0
+    with PROFILER.stage('dispatch'):
+        dispatch = RESULT_CACHE.get_or_compute(
+            (data['version'], 'dispatch', position, scenario_hash(scenario)),
+            lambda: dispatch_sensitivity_data(dispatch_grid(with_scenario_tariff(data['df'].iloc[[position]], scenario),
+                                                            capex=scenario['capex'],
+                                                            generation=scenario['generation']), 0))
+    current = dispatch[dispatch['BESS Size (% of Solar)'] == bess_pct].iloc[0]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Peak energy shaved (kWh/yr)", format_indian(current['Peak Shaved (kWh/yr)']))
+    col2.metric("ToD savings (₹/yr)", format_indian(current['Savings (₹/yr)']))
+    col3.metric("Dispatch ROI", f"{current['Dispatch ROI (%)']:.2f}%")
+    with PROFILER.stage('chart'):
+        st.altair_chart(alt.Chart(dispatch).mark_line(point=True).encode(
+            x=alt.X('BESS Size (% of Solar)', scale=alt.Scale(domain=[0, 100])),
+            y='Dispatch ROI (%)',
+            tooltip=list(dispatch.columns)
+        ).properties(height=300), width="stretch")
+    st.caption("Hourly year of ToD-shaped load and solar; the battery charges overnight and from "
+               "surplus solar and discharges into the 6-8 AM and 6-10 PM peaks.")
+
+def lifetime_section(data, position, bess_pct, scenarios, scenario, assumptions):
+    import altair as alt
+
+    client_rows = with_scenario_tariff(data['df'].iloc[[position]], scenario)
+    with PROFILER.stage('montecarlo'):
+        lifetime, histogram = RESULT_CACHE.get_or_compute(
+            (data['version'], 'montecarlo', position, bess_pct, scenario_hash(scenario),
+             tuple(sorted(assumptions.items()))),
+            lambda: lifetime_views(client_rows, bess_pct, scenario, assumptions))
+    if lifetime.empty:
+        st.info("No option has capacity to install for this client.")
+        return
+    st.dataframe(lifetime.round(2), hide_index=True, width="stretch")
+    with PROFILER.stage('chart'):
+        st.altair_chart(alt.Chart(histogram).mark_bar(opacity=0.6).encode(
+            x=alt.X('NPV from (₹)', bin='binned', title='NPV (₹)'),
+            x2='NPV to (₹)',
+            y=alt.Y('Scenarios', stack=None),
+            color='Option'
+        ).properties(height=300), width="stretch")
+    st.caption(f"{assumptions['scenarios']:,} scenarios over {assumptions['years']} years "
+               f"at a {assumptions['discount_rate']:.1%} discount rate")
+
+# Tabs below the overview; only the open one runs, so a rerun pays for one section
+CLIENT_SECTIONS = {
+    "\U0001F4A1 Available Opportunities": opportunities_section,
+    "\U0001F4C8 ROI Analysis": roi_section,
+    "\u23F1 Simulated Peak Shaving": dispatch_section,
+    "\U0001F3B2 Lifetime Economics": lifetime_section,
+}
+
+def render_page():
+    data = current_data()
+    df = data['df']
+    client_index = data['index']
+    client = st.sidebar.selectbox("Select Client", client_index['names'])
+    with PROFILER.stage('select_client'):
+        position = client_index['positions'][client]
+        selected = df.iloc[position]
+    if client in client_index['duplicates']:
+        st.sidebar.warning(f"'{client}' appears more than once in the data; showing the first row.")
 
     st.title(f"\U0001F4CA Client Overview: {client}")
 
-    # Load Info Table
-    load_info = {
-        "Parameter": ["Voltage Level", "Sanctioned Load", "Contract Demand", 
-                     "Average Load Factor", "Annual Consumption", "Peak Hour Consumption"],
-        "Value": [
-            f"{selected['Voltage Level']} kV",
-            f"{format_indian(selected['Sanctioned Load (mVA)'])} mVA",
-            f"{format_indian(selected['Contract Demand (mVA)'])} mVA",
-            f"{get_percentage(selected['Average Load Factor']*100):.2f}%",
-            f"{format_indian(selected['Annual Consumption'])} kWh",
-            f"{get_percentage(selected['6-10 PM Consumption'])*100 + get_percentage(selected['6-8 AM Consumption'])*100:.2f}% (6-10 PM + 6-8 AM)"
-        ]
-    }
-
-    # Solar Info Table
-    solar_info = {
-        "Parameter": ["Solar Capacity (AC)", "Solar Capacity (DC)", 
-                     "Annual Setoff", "Green Energy Contribution"],
-        "Value": [
-            f"{format_indian(selected.get('Installed Solar Capacity (AC)', 0))} MW",
-            f"{format_indian(selected.get('Installed Solar Capacity (DC)', 0))} MWp",
-            f"{format_indian(selected['Annual Setoff'])} kWh",
-            f"{get_percentage(selected['Percent Green Consumption']*100):.2f}%"
-        ]
-    }
+    with PROFILER.stage('overview'):
+        load_html, solar_html = RESULT_CACHE.get_or_compute((data['version'], 'overview', position),
+                                                            lambda: overview_html(selected))
 
     # Display Tables
     col1, col_sep, col2 = st.columns([6, 0.1, 6])
     with col1:
         st.subheader("\u26A1 Basic Load Information")
-        st.markdown(
-            pd.DataFrame(load_info).to_html(
-                index=False, 
-                escape=False,
-                formatters={"Value": lambda x: f"<span style='color:#e67300;font-weight:bold'>{x}</span>"}
-            ).replace(
-                '<th>', '<th style="text-align:center; background-color:#f0f0f0; color:#000;">'
-            ),
-            unsafe_allow_html=True
-        )
+        st.markdown(load_html, unsafe_allow_html=True)
     
     with col_sep:
         st.markdown("<div style='height:100%; border-left: 3px solid #bbb;'></div>", unsafe_allow_html=True)
 
     with col2:
         st.subheader("\U0001F31E Existing Solar Setup")
-        st.markdown(
-            pd.DataFrame(solar_info).to_html(
-                index=False, 
-                escape=False,
-                formatters={"Value": lambda x: f"<span style='color:#e67300;font-weight:bold'>{x}</span>"}
-            ).replace(
-                '<th>', '<th style="text-align:center; background-color:#f0f0f0; color:#000;">'
-            ),
-            unsafe_allow_html=True
-        )
+        st.markdown(solar_html, unsafe_allow_html=True)
 
     st.markdown("""<hr style="height:5px;border:none;color:#333;background-color:#333;" />""", unsafe_allow_html=True)
 
-    # --- Opportunities Section ---
-    st.title("\U0001F4A1 Available Opportunities")
-    solar_ac = selected.get('Installed Solar Capacity (AC)', 0)
-    solar_dc = selected.get('Installed Solar Capacity (DC)', 0)
-    contract_demand = selected['Contract Demand (mVA)']
-    sanctioned_load = selected['Sanctioned Load (mVA)']
-
-    # Opportunity Calculations
-    opportunities = []
-    
-    # Opportunity 1: Solar to Contract Demand
-    available_cd_ac = contract_demand - solar_ac
-    available_cd_pct = (available_cd_ac / contract_demand) * 100 if contract_demand > 0 else 0
-    if available_cd_pct >= 20:
-        opportunities.append({
-            "Opportunity": "Solar to Contract Demand",
-            "Available AC Capacity (kW)": f"{format_indian(available_cd_ac)}",
-            "Recommended DC Capacity (kW)": f"{format_indian(available_cd_ac * 1.4)}",
-            "Status": "Available",
-            "CD Increase Required": "N/A"
-        })
-    else:
-        opportunities.append({
-            "Opportunity": "Solar to Contract Demand",
-            "Available AC Capacity (kW)": f"{format_indian(available_cd_ac)}",
-            "Recommended DC Capacity (kW)": "N/A (Less than 20%)",
-            "Status": "Not Viable",
-            "CD Increase Required": "N/A"
-        })
-
-    # Opportunity 2: Increase CD to SL + Solar
-    available_sl_ac = sanctioned_load - solar_ac
-    available_sl_pct = (available_sl_ac / contract_demand) * 100 if contract_demand > 0 else 0
-    if (sanctioned_load > contract_demand) and (available_sl_pct >= 20):
-        opportunities.append({
-            "Opportunity": "Increase CD to SL + Solar",
-            "Available AC Capacity (kW)": f"{format_indian(available_sl_ac)}",
-            "Recommended DC Capacity (kW)": f"{format_indian(available_sl_ac * 1.4)}",
-            "Status": "Available",
-            "CD Increase Required": f"{format_indian(sanctioned_load - contract_demand)} mVA"
-        })
-    else:
-        reason = "Sanctioned load ≤ Current CD" if sanctioned_load <= contract_demand else "Available capacity < 20%"
-        opportunities.append({
-            "Opportunity": "Increase CD to SL + Solar",
-            "Available AC Capacity (kW)": f"{format_indian(available_sl_ac)}",
-            "Recommended DC Capacity (kW)": f"N/A ({reason})",
-            "Status": "Not Viable",
-            "CD Increase Required": f"{format_indian(sanctioned_load - contract_demand)} mVA" if sanctioned_load > contract_demand else "N/A"
-        })
-
-    # Other Opportunities
-    opportunities.extend([
-        {
-            "Opportunity": "BESS Installation",
-            "Available AC Capacity (kW)": "Based on solar",
-            "Recommended DC Capacity (kW)": "Based on % selected",
-            "Status": "Pending",
-            "CD Increase Required": "N/A"
-        },
-        {
-            "Opportunity": "Wind Installation",
-            "Available AC Capacity (kW)": "Based on contract demand",
-            "Recommended DC Capacity (kW)": "N/A",
-            "Status": "Pending",
-            "CD Increase Required": "N/A"
-        }
-    ])
-
-    # Display Opportunities Table
-    df_opportunities = pd.DataFrame(opportunities)[['Opportunity', 'Available AC Capacity (kW)', 
-                                                  'Recommended DC Capacity (kW)', 'Status', 
-                                                  'CD Increase Required']]
-
-    st.markdown(
-        df_opportunities.to_html(
-            index=False, 
-            escape=False,
-            formatters={
-                "Available AC Capacity (kW)": lambda x: f"<span style='color:#0066cc;font-weight:bold'>{x}</span>",
-                "Recommended DC Capacity (kW)": lambda x: f"<span style='color:#009933;font-weight:bold'>{x}</span>",
-                "Status": lambda x: f"<span style='color:{"green" if x=="Available" else "orange" if x=="Pending" else "red"};font-weight:bold'>{x}</span>",
-                "CD Increase Required": lambda x: f"<span style='color:#9900cc;font-weight:bold'>{x}</span>"
-            }
-        ).replace(
-            '<th>', '<th style="text-align:center; background-color:#f0f0f0; color:#000;">'
-        ),
-        unsafe_allow_html=True
-    )
-
-    st.markdown("""<hr style="height:5px;border:none;color:#333;background-color:#333;" />""", unsafe_allow_html=True)
-
-    # --- ROI Analysis ---
-    st.title("\U0001F4C8 ROI Analysis")
-    
     # BESS Configuration
     bess_pct = st.sidebar.select_slider(
         "Select BESS Size (% of Solar)",
-        options=list(range(0, 101, 5)),
+        options=BESS_STEPS,
         value=10
     )
-    waiver_pct = 0 if bess_pct == 0 else (75 + (bess_pct//5 - 1)*5 if bess_pct < 30 else 100)
+    waiver_pct = waiver_percentage(bess_pct)
     st.sidebar.markdown(f"""
     **Transmission and Wheeling Charges Waiver**  
     <span style='font-size:24px; color:#4CAF50'>{waiver_pct}%</span>
     """, unsafe_allow_html=True)
 
-    # ROI Calculations
-    capex = {
-        'solar': 3.5e6,
-        'bess': 4.0e6,
-        'wind': 6.5e6
-    }
-    generation = {
-        'solar': 16.5e5,
-        'wind': 26.0e5
-    }
-    
+    scenarios, scenario = choose_scenario()
+    # Rendered whatever tab is open: Streamlit drops the state of widgets a rerun skips
+    assumptions = lifetime_assumptions()
+
+    tabs = st.tabs(list(CLIENT_SECTIONS), key='client_section', on_change="rerun")
     try:
-        available_cd = contract_demand/1000 - solar_ac/1000
-        available_sl = selected['Sanctioned Load (mVA)']/1000 - solar_ac/1000
-        base_tariff = selected['Base Tariff']
-
-        # Solar ROI Calculations
-        solar_to_cd_roi = ((available_cd * generation['solar'] * base_tariff) / 
-                         (available_cd * capex['solar'])) if available_cd > 0 else 0
-        solar_to_sl_roi = ((available_sl * generation['solar'] * base_tariff) / 
-                         (available_sl * capex['solar'])) if available_sl > 0 else 0
-        
-        # BESS ROI Calculation
-        bess_mw = solar_dc/1000 * bess_pct/100
-        bess_roi = (selected['Annual Consumption'] * (1.65 * waiver_pct/100) / 
-                   (bess_mw * capex['bess'])) if bess_mw > 0 else 0
-        
-        # Wind ROI Calculation
-        wind_roi = (contract_demand/1000 * generation['wind'] * base_tariff / 
-                   (contract_demand/1000 * capex['wind']))
-        
-        # Display Results
-        roi_data = pd.DataFrame({
-            'Option': ['Solar to CD', 'Solar to SL', f'BESS ({bess_pct}%)', 'Wind'],
-            'ROI (%)': [solar_to_cd_roi*100, solar_to_sl_roi*100, bess_roi*100, wind_roi*100]
-        })
-        
-        st.altair_chart(alt.Chart(roi_data).mark_bar().encode(
-            x=alt.X('Option', sort=None),
-            y='ROI (%)',
-            color='Option'
-        ).properties(height=400), use_container_width=True)
-        
-        best_option = roi_data.loc[roi_data['ROI (%)'].idxmax()]
-        st.success(f"Recommended Option: {best_option['Option']} (ROI: {best_option['ROI (%)']:.2f}%)")
-        
+        for tab, section in zip(tabs, CLIENT_SECTIONS.values()):
+            if tab.open:
+                with tab:
+                    section(data, position, bess_pct, scenarios, scenario, assumptions)
     except KeyError as e:
         st.error(f"Missing required data column: {e}")
 
@@ -0,0 +1,136 @@
+"""Monte Carlo NPV / IRR / payback for the ROI options.
+
+Cash flows are simulated as one broadcast array of shape
+(*clients, scenarios, years, options); nothing loops over scenarios or years.
+"""
+import numpy as np
+import pandas as pd
+
+import calc
+from calc import CAPEX, GENERATION
+from roi import ROI_OPTIONS, _column
+
+DEFAULT_ASSUMPTIONS = {
+    'scenarios': 2000,
+    'years': 25,
+    'discount_rate': 0.09,
+    # Annual tariff escalation: mean and scenario-to-scenario spread
+    'tariff_escalation': 0.03,
+    'escalation_sd': 0.01,
+    # Annual output degradation per option (BESS savings come from the waiver, not output)
+    'degradation': [0.005, 0.005, 0.0, 0.003],
+    # Year-to-year output variation per option (weather), as a fraction of expected output
+    'output_sd': [0.06, 0.06, 0.0, 0.12],
+    # Installed-cost uncertainty, as a fraction of the capex assumption
+    'capex_sd': 0.05,
+    'seed': 0,
+}
+IRR_BOUNDS = (-0.99, 100.0)
+IRR_ITERATIONS = 60
+
+
+def _npv(cost, flows, rate, years):
+    """NPV of -cost at t=0 and flows at t=1..Y (years on axis -2) for a broadcastable rate"""
+    discount = (1 + rate[..., None, :]) ** -years[:, None]
+    return (flows * discount).sum(axis=-2) - cost
+
+
+def _irr(cost, flows, years):
+    """IRR by vectorized bisection over every (scenario, option); NaN where there is no sign change"""
+    low = np.full(cost.shape, IRR_BOUNDS[0])
+    high = np.full(cost.shape, IRR_BOUNDS[1])
+    npv_low = _npv(cost, flows, low, years)
+    npv_high = _npv(cost, flows, high, years)
+    bracketed = (npv_low > 0) & (npv_high < 0)
+    for _ in range(IRR_ITERATIONS):
+        mid = (low + high) / 2
+        positive = _npv(cost, flows, mid, years) > 0
+        low = np.where(positive, mid, low)
+        high = np.where(positive, high, mid)
+    return np.where(bracketed, (low + high) / 2, np.nan)
+
+
+def _payback(cost, flows):
+    """Years until cumulative cash flow covers the cost, interpolated within the crossing year"""
+    cumulative = flows.cumsum(axis=-2)
+    covered = cumulative >= cost[..., None, :]
+    year = covered.argmax(axis=-2)
+    before = np.take_along_axis(cumulative, year[..., None, :] - 1, axis=-2)[..., 0, :]
+    before = np.where(year > 0, before, 0)
+    during = np.take_along_axis(flows, year[..., None, :], axis=-2)[..., 0, :]
+    fraction = np.divide(cost - before, during, out=np.zeros(cost.shape), where=during > 0)
+    return np.where(covered.any(axis=-2), year + fraction, np.nan)
+
+
+def simulate(cost, savings, assumptions=None):
+    """NPV, IRR and payback distributions for options with the given cost and year-one savings.
+
+    cost and savings have shape (*clients, options); results have shape
+    (*clients, scenarios, options). Options with no cost are NaN throughout.
+    """
+    a = dict(DEFAULT_ASSUMPTIONS, **(assumptions or {}))
+    rng = np.random.default_rng(a['seed'])
+    cost = np.asarray(cost, dtype=float)[..., None, :]
+    savings = np.asarray(savings, dtype=float)[..., None, None, :]
+    lead, n_options = cost.shape[:-2], cost.shape[-1]
+    scenarios, n_years = a['scenarios'], a['years']
+    years = np.arange(1, n_years + 1, dtype=float)
+
+    escalation = rng.normal(a['tariff_escalation'], a['escalation_sd'], (*lead, scenarios, 1, 1))
+    output = 1 + rng.standard_normal((*lead, scenarios, n_years, n_options)) * np.asarray(a['output_sd'])
+    degradation = (1 - np.asarray(a['degradation'])) ** (years[:, None] - 1)
+    flows = savings * (1 + escalation) ** (years[:, None] - 1) * degradation * np.maximum(output, 0)
+    cost = cost * np.maximum(1 + rng.normal(0, a['capex_sd'], (*lead, scenarios, n_options)), 0)
+
+    rate = np.full(cost.shape, a['discount_rate'])
+    invested = cost > 0
+    return {
+        'npv': np.where(invested, _npv(cost, flows, rate, years), np.nan),
+        'irr': np.where(invested, _irr(cost, flows, years), np.nan),
+        'payback': np.where(invested, _payback(cost, flows), np.nan),
+    }
+
+
+def client_economics(df, bess_pct, capex=CAPEX, generation=GENERATION):
+    """(cost, year-one savings) per client and option, each of shape (clients, options)"""
+    return calc.option_economics(
+        _column(df, 'Contract Demand (mVA)'), _column(df, 'Sanctioned Load (mVA)'),
+        _column(df, 'Installed Solar Capacity (AC)'), _column(df, 'Installed Solar Capacity (DC)'),
+        _column(df, 'Annual Consumption'), _column(df, 'Base Tariff'), bess_pct, capex, generation
+    )
+
+
+def summarize(results, options=ROI_OPTIONS):
+    """P10/P50/P90 and P(NPV > 0) per option for one client's (scenarios, options) results"""
+    rows = []
+    with np.errstate(invalid='ignore'):
+        for i, option in enumerate(options):
+            npv, irr, payback = (results[key][:, i] for key in ('npv', 'irr', 'payback'))
+            if np.isnan(npv).all():
+                continue
+            p10, p50, p90 = np.nanpercentile(npv, [10, 50, 90])
+            rows.append({
+                'Option': option,
+                'NPV P10 (₹)': p10,
+                'NPV P50 (₹)': p50,
+                'NPV P90 (₹)': p90,
+                'P(NPV > 0)': np.mean(npv > 0),
+                'IRR P50 (%)': np.nanmedian(irr) * 100 if not np.isnan(irr).all() else np.nan,
+                'Payback P50 (years)': np.nanmedian(payback) if not np.isnan(payback).all() else np.nan,
+                'P(payback within horizon)': np.mean(~np.isnan(payback)),
+            })
+    return pd.DataFrame(rows)
+
+
+def npv_histogram(results, options=ROI_OPTIONS, bins=40):
+    """Binned NPV counts per option, so charts receive bins instead of every scenario"""
+    frames = []
+    for i, option in enumerate(options):
+        npv = results['npv'][:, i]
+        npv = npv[~np.isnan(npv)]
+        if not len(npv):
+            continue
+        counts, edges = np.histogram(npv, bins=bins)
+        frames.append(pd.DataFrame({'Option': option, 'NPV from (₹)': edges[:-1],
+                                    'NPV to (₹)': edges[1:], 'Scenarios': counts}))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
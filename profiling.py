@@ -0,0 +1,87 @@
+import json
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+WINDOW = 1000
+
+
+class Profiler:
+    """Process-wide stage timings (last WINDOW samples per stage) and event counters"""
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._totals = defaultdict(float)
+        self._calls = Counter()
+        self._events = Counter()
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name, seconds):
+        with self._lock:
+            self._samples[name].append(seconds)
+            self._totals[name] += seconds
+            self._calls[name] += 1
+
+    def count(self, event, n=1):
+        with self._lock:
+            self._events[event] += n
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+            self._calls.clear()
+            self._events.clear()
+
+    def summary(self):
+        """{'stages': {name: calls/p50/p95/max/total}, 'events': {name: count}}, times in ms"""
+        with self._lock:
+            samples = {name: np.array(values) for name, values in self._samples.items()}
+            totals, calls, events = dict(self._totals), dict(self._calls), dict(self._events)
+        stages = {}
+        for name, values in samples.items():
+            p50, p95 = np.percentile(values, [50, 95]) if len(values) else (0.0, 0.0)
+            stages[name] = {
+                'calls': calls[name],
+                'p50_ms': p50 * 1000,
+                'p95_ms': p95 * 1000,
+                'max_ms': values.max() * 1000 if len(values) else 0.0,
+                'total_ms': totals[name] * 1000,
+            }
+        return {'stages': stages, 'events': events}
+
+    def to_json(self):
+        return json.dumps(self.summary(), indent=2, sort_keys=True)
+
+    def to_prometheus(self, prefix="rays"):
+        """Prometheus text exposition: one summary for stage timings, one counter for events"""
+        summary = self.summary()
+        lines = [f"# HELP {prefix}_stage_seconds Dashboard stage durations over the last {self.window} calls.",
+                 f"# TYPE {prefix}_stage_seconds summary"]
+        for name, stats in sorted(summary['stages'].items()):
+            lines += [
+                f'{prefix}_stage_seconds{{stage="{name}",quantile="0.5"}} {stats["p50_ms"] / 1000:.6g}',
+                f'{prefix}_stage_seconds{{stage="{name}",quantile="0.95"}} {stats["p95_ms"] / 1000:.6g}',
+                f'{prefix}_stage_seconds_sum{{stage="{name}"}} {stats["total_ms"] / 1000:.6g}',
+                f'{prefix}_stage_seconds_count{{stage="{name}"}} {stats["calls"]}',
+            ]
+        lines += [f"# HELP {prefix}_events_total Cache hits/misses and other dashboard events.",
+                  f"# TYPE {prefix}_events_total counter"]
+        lines += [f'{prefix}_events_total{{event="{name}"}} {count}'
+                  for name, count in sorted(summary['events'].items())]
+        return "\n".join(lines) + "\n"
+
+
+PROFILER = Profiler()
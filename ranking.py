@@ -0,0 +1,114 @@
+"""Portfolio ranking: per-metric sort orders and voltage / best-option indexes built once per
+data version, so top-N and threshold queries slice or partially sort instead of sorting."""
+import numpy as np
+import pandas as pd
+
+from roi import BESS_STEPS, ROI_OPTIONS, _column
+
+CAPACITY_METRICS = ['Available CD AC', 'Recommended CD DC', 'Available SL AC', 'Recommended SL DC']
+ROI_METRICS = [f"{option} ROI (%)" for option in ROI_OPTIONS] + ['Best ROI (%)']
+METRICS = CAPACITY_METRICS + ROI_METRICS
+
+
+def _group_index(codes, n_groups):
+    """Row positions per group code, each in ascending row order"""
+    order = np.argsort(codes, kind='stable').astype(np.int32)
+    return np.split(order, np.searchsorted(codes[order], np.arange(1, n_groups)))
+
+
+def build_ranking(df, opportunities, base_table, bess_grid, bess_pct):
+    """Metric columns for every client plus, per metric, the row order by descending value
+    (NaN last) and the values in that order. Row positions are int32 and option codes int8,
+    so a 1M-client ranking fits in the result cache next to a scenario table."""
+    roi = np.column_stack([
+        bess_grid['bess_roi'][:, BESS_STEPS.index(bess_pct)] if option == 'BESS'
+        else base_table[option].to_numpy(dtype=float)
+        for option in ROI_OPTIONS
+    ]).reshape(len(df), len(ROI_OPTIONS))
+    best = (roi.argmax(axis=1) if len(df) else np.zeros(0)).astype(np.int8)
+    values = {metric: opportunities[metric].to_numpy(dtype=float) for metric in CAPACITY_METRICS}
+    values.update({metric: roi[:, i] for i, metric in enumerate(ROI_METRICS[:-1])})
+    values['Best ROI (%)'] = roi[np.arange(len(df)), best]
+
+    order, ranked = {}, {}
+    for metric, column in values.items():
+        # Sorting -x ascending puts the largest first and NaN last
+        order[metric] = np.argsort(-column, kind='stable').astype(np.int32)
+        ranked[metric] = column[order[metric]]
+
+    voltage = _column(df, 'Voltage Level', np.nan)
+    levels, voltage_codes = np.unique(voltage, return_inverse=True)
+    return {
+        'bess_pct': bess_pct,
+        'names': df['Client Name'].astype(str).to_numpy(),
+        'voltage': voltage,
+        'values': values,
+        'order': order,
+        'ranked': ranked,
+        'voltage_levels': levels,
+        'by_voltage': dict(zip(levels.tolist(), _group_index(voltage_codes.ravel(), len(levels)))),
+        'best_option': best,
+        'by_best_option': dict(zip(ROI_OPTIONS, _group_index(best, len(ROI_OPTIONS)))),
+    }
+
+
+def _candidates(ranking, voltage_levels, best_options):
+    """Row positions allowed by the voltage and best-option filters (None: no filter)"""
+    candidates = None
+    if voltage_levels:
+        candidates = np.concatenate([ranking['by_voltage'].get(level, np.zeros(0, dtype=int))
+                                     for level in voltage_levels])
+    if best_options and candidates is None:
+        candidates = np.concatenate([ranking['by_best_option'][option] for option in best_options])
+    elif best_options:
+        codes = [ROI_OPTIONS.index(option) for option in best_options]
+        candidates = candidates[np.isin(ranking['best_option'][candidates], codes)]
+    return candidates
+
+
+def query(ranking, metric, top_n=50, min_value=None, voltage_levels=None, best_options=None):
+    """Top `top_n` clients by `metric` (descending) among those at or above `min_value` and in
+    the given voltage levels / best options.
+
+    Returns (row positions in rank order, number of clients matching the filters).
+    Unfiltered queries slice the precomputed order; the threshold is a binary
+    search in it. Filtered queries argpartition the candidate rows and only sort
+    the top_n that survive.
+    """
+    candidates = _candidates(ranking, voltage_levels, best_options)
+    if candidates is None:
+        ranked = ranking['ranked'][metric]
+        matching = len(ranked) - np.isnan(ranked).sum()
+        if min_value is not None:
+            # ranked is descending, so search its negation (ascending) for the cut-off
+            matching = min(matching, np.searchsorted(-ranked, -min_value, side='right'))
+        return ranking['order'][metric][:min(top_n, matching)], int(matching)
+
+    values = ranking['values'][metric][candidates]
+    keep = ~np.isnan(values) if min_value is None else values >= min_value
+    candidates, values = candidates[keep], values[keep]
+    if top_n < len(values):
+        # Everything above the top_n-th value, then the earliest rows among ties with it
+        cutoff = -np.partition(-values, top_n - 1)[top_n - 1]
+        above = np.flatnonzero(values > cutoff)
+        ties = np.flatnonzero(values == cutoff)
+        need = top_n - len(above)
+        if need < len(ties):
+            ties = ties[np.argpartition(candidates[ties], need - 1)[:need]]
+        top = np.concatenate([above, ties])
+        candidates, values = candidates[top], values[top]
+    return candidates[np.lexsort((candidates, -values))], int(keep.sum())
+
+
+def ranking_table(ranking, positions, metric):
+    """Ranked rows for display: rank, client, voltage, best option and the requested metric
+    next to the capacity and ROI columns"""
+    table = pd.DataFrame({
+        'Rank': np.arange(1, len(positions) + 1),
+        'Client Name': ranking['names'][positions],
+        'Voltage Level': ranking['voltage'][positions],
+        'Best Option': np.asarray(ROI_OPTIONS, dtype=object)[ranking['best_option'][positions]],
+    })
+    for column in [metric] + [m for m in METRICS if m != metric]:
+        table[column] = ranking['values'][column][positions]
+    return table
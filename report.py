@@ -0,0 +1,160 @@
+import pandas as pd
+
+from calc import MIN_AVAILABLE_PCT, solar_to_cd, solar_to_sl
+from formatting import format_indian
+from roi import ROI_OPTIONS
+
+HEADER_CELL = '<th style="text-align:center; background-color:#f0f0f0; color:#000;">'
+VALUE_FORMATTERS = {"Value": lambda x: f"<span style='color:#e67300;font-weight:bold'>{x}</span>"}
+OPPORTUNITY_FORMATTERS = {
+    "Available AC Capacity (kW)": lambda x: f"<span style='color:#0066cc;font-weight:bold'>{x}</span>",
+    "Recommended DC Capacity (kW)": lambda x: f"<span style='color:#009933;font-weight:bold'>{x}</span>",
+    "Status": lambda x: f"<span style='color:{"green" if x=="Available" else "orange" if x=="Pending" else "red"};font-weight:bold'>{x}</span>",
+    "CD Increase Required": lambda x: f"<span style='color:#9900cc;font-weight:bold'>{x}</span>"
+}
+
+
+def get_percentage(value):
+    try:
+        return float(str(value).replace('%', ''))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def render_table(table, formatters):
+    """Styled HTML for one of the dashboard tables"""
+    return table.to_html(
+        index=False, 
+        escape=False,
+        formatters=formatters
+    ).replace('<th>', HEADER_CELL)
+
+
+def client_info_tables(selected):
+    """Basic load information and existing solar setup tables for one client row"""
+    # Load Info Table
+    load_info = {
+        "Parameter": ["Voltage Level", "Sanctioned Load", "Contract Demand", 
+                     "Average Load Factor", "Annual Consumption", "Peak Hour Consumption"],
+        "Value": [
+            f"{format_indian(selected['Voltage Level'])} kV",
+            f"{format_indian(selected['Sanctioned Load (mVA)'])} mVA",
+            f"{format_indian(selected['Contract Demand (mVA)'])} mVA",
+            f"{get_percentage(selected['Average Load Factor']*100):.2f}%",
+            f"{format_indian(selected['Annual Consumption'])} kWh",
+            f"{get_percentage(selected['6-10 PM Consumption'])*100 + get_percentage(selected['6-8 AM Consumption'])*100:.2f}% (6-10 PM + 6-8 AM)"
+        ]
+    }
+
+    # Solar Info Table
+    solar_info = {
+        "Parameter": ["Solar Capacity (AC)", "Solar Capacity (DC)", 
+                     "Annual Setoff", "Green Energy Contribution"],
+        "Value": [
+            f"{format_indian(selected.get('Installed Solar Capacity (AC)', 0))} MW",
+            f"{format_indian(selected.get('Installed Solar Capacity (DC)', 0))} MWp",
+            f"{format_indian(selected['Annual Setoff'])} kWh",
+            f"{get_percentage(selected['Percent Green Consumption']*100):.2f}%"
+        ]
+    }
+
+    return pd.DataFrame(load_info), pd.DataFrame(solar_info)
+
+
+def opportunities_table(selected):
+    """Available opportunities table for one client row"""
+    solar_ac = selected.get('Installed Solar Capacity (AC)', 0)
+    contract_demand = selected['Contract Demand (mVA)']
+    sanctioned_load = selected['Sanctioned Load (mVA)']
+
+    # Opportunity Calculations
+    opportunities = []
+    
+    # Opportunity 1: Solar to Contract Demand
+    available_cd_ac, _, cd_viable, recommended_cd_dc = solar_to_cd(contract_demand, solar_ac)
+    if cd_viable:
+        opportunities.append({
+            "Opportunity": "Solar to Contract Demand",
+            "Available AC Capacity (kW)": f"{format_indian(available_cd_ac)}",
+            "Recommended DC Capacity (kW)": f"{format_indian(recommended_cd_dc)}",
+            "Status": "Available",
+            "CD Increase Required": "N/A"
+        })
+    else:
+        opportunities.append({
+            "Opportunity": "Solar to Contract Demand",
+            "Available AC Capacity (kW)": f"{format_indian(available_cd_ac)}",
+            "Recommended DC Capacity (kW)": f"N/A (Less than {MIN_AVAILABLE_PCT}%)",
+            "Status": "Not Viable",
+            "CD Increase Required": "N/A"
+        })
+
+    # Opportunity 2: Increase CD to SL + Solar
+    available_sl_ac, _, sl_viable, recommended_sl_dc, cd_increase = solar_to_sl(contract_demand, sanctioned_load, solar_ac)
+    if sl_viable:
+        opportunities.append({
+            "Opportunity": "Increase CD to SL + Solar",
+            "Available AC Capacity (kW)": f"{format_indian(available_sl_ac)}",
+            "Recommended DC Capacity (kW)": f"{format_indian(recommended_sl_dc)}",
+            "Status": "Available",
+            "CD Increase Required": f"{format_indian(cd_increase)} mVA"
+        })
+    else:
+        reason = "Sanctioned load ≤ Current CD" if sanctioned_load <= contract_demand else f"Available capacity < {MIN_AVAILABLE_PCT}%"
+        opportunities.append({
+            "Opportunity": "Increase CD to SL + Solar",
+            "Available AC Capacity (kW)": f"{format_indian(available_sl_ac)}",
+            "Recommended DC Capacity (kW)": f"N/A ({reason})",
+            "Status": "Not Viable",
+            "CD Increase Required": f"{format_indian(cd_increase)} mVA" if sanctioned_load > contract_demand else "N/A"
+        })
+
+    # Other Opportunities
+    opportunities.extend([
+        {
+            "Opportunity": "BESS Installation",
+            "Available AC Capacity (kW)": "Based on solar",
+            "Recommended DC Capacity (kW)": "Based on % selected",
+            "Status": "Pending",
+            "CD Increase Required": "N/A"
+        },
+        {
+            "Opportunity": "Wind Installation",
+            "Available AC Capacity (kW)": "Based on contract demand",
+            "Recommended DC Capacity (kW)": "N/A",
+            "Status": "Pending",
+            "CD Increase Required": "N/A"
+        }
+    ])
+
+    return pd.DataFrame(opportunities)[['Opportunity', 'Available AC Capacity (kW)', 
+                                        'Recommended DC Capacity (kW)', 'Status', 
+                                        'CD Increase Required']]
+
+
+def roi_chart_data(roi_row, bess_pct):
+    """Option/ROI (%) rows for one client's row of the ROI table"""
+    return pd.DataFrame({
+        'Option': ['Solar to CD', 'Solar to SL', f'BESS ({bess_pct}%)', 'Wind'],
+        'ROI (%)': [roi_row[option] for option in ROI_OPTIONS]
+    })
+
+
+def bess_sensitivity_data(grid, position):
+    """BESS size / waiver / ROI rows for one client, read from the BESS grid"""
+    return pd.DataFrame({
+        'BESS Size (% of Solar)': grid['bess_pct'],
+        'Waiver (%)': grid['waiver_pct'],
+        'BESS ROI (%)': grid['bess_roi'][position]
+    })
+
+
+def dispatch_sensitivity_data(grid, position):
+    """BESS size / simulated peak shaving / savings / ROI rows for one client of a dispatch grid"""
+    return pd.DataFrame({
+        'BESS Size (% of Solar)': grid['bess_pct'],
+        'Peak Shaved (kWh/yr)': grid['peak_shaved_kwh'][position],
+        'Solar Shifted (kWh/yr)': grid['solar_shifted_kwh'][position],
+        'Savings (₹/yr)': grid['savings'][position],
+        'Dispatch ROI (%)': grid['roi'][position],
+    })
@@ -0,0 +1,107 @@
+"""Bounded process-wide cache for per-client results and rendered HTML, shared by all sessions."""
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from profiling import PROFILER
+
+MAX_ENTRIES = int(os.environ.get("RAYS_RESULT_CACHE_ENTRIES", 2048))
+# At 1M clients a scenario table is about 204 MB and a ranking about 196 MB; both must fit
+MAX_MB = float(os.environ.get("RAYS_RESULT_CACHE_MB", 512))
+TTL_SECONDS = float(os.environ.get("RAYS_RESULT_CACHE_TTL_SECONDS", 3600))
+
+
+def approx_size(value):
+    """Rough bytes held by a cached value (strings, frames, arrays and containers of them)"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(approx_size(item) for item in value)
+    if isinstance(value, dict):
+        return sum(approx_size(item) for item in value.values())
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """LRU cache bounded by entry count and approximate size, with a time-to-live.
+
+    Keys start with the data version they were computed from; invalidate()
+    drops every entry older than the current version when the data reloads.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_mb=MAX_MB, ttl_seconds=TTL_SECONDS):
+        self.max_entries = max_entries
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+
+    def _drop(self, key, reason):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+        PROFILER.count(f'result_cache_evict_{reason}')
+
+    def get(self, key):
+        """Cached value for key, or None; a miss is left for get_or_compute to count"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            self._entries.move_to_end(key)
+            PROFILER.count('result_cache_hit')
+            return entry[2]
+
+    def get_or_compute(self, key, compute):
+        """Cached value for key, or compute() stored under it; compute runs outside the lock,
+        so concurrent misses on one key may compute twice but never block other keys"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                PROFILER.count('result_cache_hit')
+                return entry[2]
+            if entry is not None:
+                self._drop(key, 'ttl')
+        PROFILER.count('result_cache_miss')
+        value = compute()
+        size = approx_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key, 'replaced')
+            if size > self.max_bytes or self.max_entries <= 0:
+                PROFILER.count('result_cache_uncacheable')
+            else:
+                self._entries[key] = (now + self.ttl_seconds, size, value)
+                self._bytes += size
+                while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                    self._drop(next(iter(self._entries)), 'size')
+        return value
+
+    def invalidate(self, version):
+        """Drop entries computed from data older than `version`"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] < version]:
+                self._drop(key, 'reload')
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes, 'max_entries': self.max_entries,
+                    'max_bytes': self.max_bytes, 'ttl_seconds': self.ttl_seconds}
+
+
+RESULT_CACHE = ResultCache()
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+import calc
+from calc import waiver_percentage
+
+ROI_OPTIONS = ['Solar to CD', 'Solar to SL', 'BESS', 'Wind']
+BESS_STEPS = list(range(0, 101, 5))
+
+
+def _column(df, name, default=0.0):
+    """Column as a float array, falling back to a constant like Series.get"""
+    if name in df.columns:
+        return df[name].to_numpy(dtype=float)
+    return np.full(len(df), default, dtype=float)
+
+
+def compute_opportunities(df):
+    """Per-client solar opportunity sizing (the two solar rows of the opportunities table)"""
+    contract_demand = df['Contract Demand (mVA)'].to_numpy(dtype=float)
+    sanctioned_load = df['Sanctioned Load (mVA)'].to_numpy(dtype=float)
+    solar_ac = _column(df, 'Installed Solar Capacity (AC)')
+    cd_ac, cd_pct, cd_viable, cd_dc = calc.solar_to_cd(contract_demand, solar_ac)
+    sl_ac, sl_pct, sl_viable, sl_dc, cd_increase = calc.solar_to_sl(contract_demand, sanctioned_load, solar_ac)
+    return pd.DataFrame({
+        'Client Name': df['Client Name'].to_numpy(),
+        'Available CD AC': cd_ac,
+        'Available CD (%)': cd_pct,
+        'Solar to CD Viable': cd_viable,
+        'Recommended CD DC': cd_dc,
+        'Available SL AC': sl_ac,
+        'Available SL (%)': sl_pct,
+        'Solar to SL Viable': sl_viable,
+        'Recommended SL DC': sl_dc,
+        'CD Increase': cd_increase,
+    }, index=df.index)
+
+
+def base_roi(df):
+    """Per-client ROI (%) of the options that do not depend on the BESS size"""
+    contract_demand = df['Contract Demand (mVA)'].to_numpy(dtype=float)
+    base_tariff = df['Base Tariff'].to_numpy(dtype=float)
+    solar_to_cd_roi, solar_to_sl_roi = calc.solar_roi(
+        contract_demand, df['Sanctioned Load (mVA)'].to_numpy(dtype=float),
+        _column(df, 'Installed Solar Capacity (AC)'), base_tariff
+    )
+    table = pd.DataFrame({
+        'Solar to CD': solar_to_cd_roi * 100,
+        'Solar to SL': solar_to_sl_roi * 100,
+        'Wind': calc.wind_roi(contract_demand, base_tariff) * 100,
+    }, index=df.index)
+    table.insert(0, 'Client Name', df['Client Name'].to_numpy())
+    return table
+
+
+def bess_roi(df, bess_pct):
+    """Per-client BESS ROI (%); an array of BESS sizes gives one column per size"""
+    annual_consumption = df['Annual Consumption'].to_numpy(dtype=float)
+    solar_dc = _column(df, 'Installed Solar Capacity (DC)')
+    if np.ndim(bess_pct):
+        annual_consumption, solar_dc = annual_consumption[:, None], solar_dc[:, None]
+    return calc.bess_roi(annual_consumption, solar_dc, bess_pct) * 100
+
+
+def with_best_option(table):
+    """Add the BESS-inclusive best option and its ROI to a table holding every ROI_OPTIONS column"""
+    roi = table[ROI_OPTIONS].to_numpy(dtype=float)
+    best = roi.argmax(axis=1)
+    table['Best Option'] = np.asarray(ROI_OPTIONS, dtype=object)[best]
+    table['Best ROI (%)'] = roi[np.arange(len(roi)), best]
+    return table
+
+
+def compute_roi(df, bess_pct):
+    """Per-client ROI (%) for every option plus the best option, in one columnar pass"""
+    table = base_roi(df)
+    table['BESS'] = bess_roi(df, bess_pct)
+    return with_best_option(table[['Client Name'] + ROI_OPTIONS])
+
+
+def compute_bess_grid(df):
+    """Waiver (%) per slider position and client x slider-position BESS ROI (%), in one pass"""
+    steps = np.asarray(BESS_STEPS)
+    return {
+        'bess_pct': steps,
+        'waiver_pct': waiver_percentage(steps),
+        'bess_roi': bess_roi(df, steps),
+    }
+
+
+def grid_roi_row(base_table, grid, position, bess_pct):
+    """One client's compute_roi row, looked up from the base table and the BESS grid"""
+    row = base_table.iloc[position].copy()
+    row['BESS'] = grid['bess_roi'][position, BESS_STEPS.index(bess_pct)]
+    roi = [row[option] for option in ROI_OPTIONS]
+    best = int(np.argmax(roi))
+    row['Best Option'] = ROI_OPTIONS[best]
+    row['Best ROI (%)'] = roi[best]
+    return row[['Client Name'] + ROI_OPTIONS + ['Best Option', 'Best ROI (%)']]
@@ -0,0 +1,193 @@
+"""Named capex / generation / tariff assumption sets, evaluated for every client at once.
+
+A scenario file is JSON (a list of {"name", "capex", "generation",
+"tariff_multiplier"} objects, missing keys taking the calc defaults) or CSV with
+one row per scenario and the columns in SCENARIO_COLUMNS.
+"""
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import calc
+from calc import CAPEX, GENERATION
+from resultcache import RESULT_CACHE
+from roi import BESS_STEPS, _column
+
+SCENARIOS_PATH = os.environ.get("RAYS_SCENARIOS")
+BASE_CASE = 'Base case'
+# CSV column -> (scenario key, sub-key)
+SCENARIO_COLUMNS = {
+    'solar_capex': ('capex', 'solar'),
+    'bess_capex': ('capex', 'bess'),
+    'wind_capex': ('capex', 'wind'),
+    'solar_generation': ('generation', 'solar'),
+    'wind_generation': ('generation', 'wind'),
+    'tariff_multiplier': ('tariff_multiplier', None),
+}
+
+
+def make_scenario(name, capex=None, generation=None, tariff_multiplier=1.0):
+    """Complete, validated scenario dict; unspecified assumptions come from the base case"""
+    for key, given, known in (('capex', capex, CAPEX), ('generation', generation, GENERATION)):
+        unknown = sorted(set(given or {}) - set(known))
+        if unknown:
+            raise ValueError(f"Scenario {name!r} has unknown {key} assumption {', '.join(map(repr, unknown))}; "
+                             f"expected {', '.join(known)}")
+    scenario = {
+        'name': str(name),
+        'capex': {key: float(value) for key, value in dict(CAPEX, **(capex or {})).items()},
+        'generation': {key: float(value) for key, value in dict(GENERATION, **(generation or {})).items()},
+        'tariff_multiplier': float(tariff_multiplier),
+    }
+    values = [*scenario['capex'].values(), *scenario['generation'].values(), scenario['tariff_multiplier']]
+    if not all(np.isfinite(values)) or min(values) < 0:
+        raise ValueError(f"Scenario {name!r} has a negative or non-numeric assumption")
+    return scenario
+
+
+def scenario_hash(scenario):
+    """Stable key of a scenario's assumptions (the name does not affect results)"""
+    assumptions = {key: scenario[key] for key in ('capex', 'generation', 'tariff_multiplier')}
+    return hashlib.sha256(json.dumps(assumptions, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _from_records(records):
+    return [make_scenario(r.get('name', f"Scenario {i + 1}"), r.get('capex'), r.get('generation'),
+                          r.get('tariff_multiplier', 1.0))
+            for i, r in enumerate(records)]
+
+
+def _from_csv(table):
+    table.columns = table.columns.str.strip()
+    unknown = set(table.columns) - set(SCENARIO_COLUMNS) - {'name'}
+    if unknown:
+        raise ValueError(f"Unknown scenario columns: {', '.join(sorted(unknown))}")
+    records = []
+    for i, row in enumerate(table.to_dict('records')):
+        record = {'name': row.get('name', f"Scenario {i + 1}"), 'capex': {}, 'generation': {}}
+        for column, (key, sub_key) in SCENARIO_COLUMNS.items():
+            if column in row and pd.notna(row[column]):
+                if sub_key is None:
+                    record[key] = row[column]
+                else:
+                    record[key][sub_key] = row[column]
+        records.append(record)
+    return _from_records(records)
+
+
+def parse_scenarios(content, filename):
+    """Scenarios from the bytes or text of a .json or .csv file"""
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+    try:
+        if filename.lower().endswith('.csv'):
+            scenarios = _from_csv(pd.read_csv(io.StringIO(content)))
+        else:
+            records = json.loads(content)
+            scenarios = _from_records(records if isinstance(records, list) else [records])
+    except (json.JSONDecodeError, pd.errors.ParserError, AttributeError, TypeError) as e:
+        raise ValueError(f"{filename} is not a valid scenario file: {e}") from e
+    names = [scenario['name'] for scenario in scenarios]
+    if len(set(names)) != len(names):
+        raise ValueError(f"{filename} has duplicate scenario names")
+    return scenarios
+
+
+def load_scenarios(path=SCENARIOS_PATH):
+    """Base case followed by the scenarios in `path` (if set), without duplicate names"""
+    scenarios = [make_scenario(BASE_CASE)]
+    if path:
+        with open(path, 'rb') as f:
+            scenarios += [s for s in parse_scenarios(f.read(), path) if s['name'] != BASE_CASE]
+    return scenarios
+
+
+def with_scenario_tariff(df, scenario):
+    """Client rows with the scenario's tariff multiplier applied to Base Tariff"""
+    if scenario['tariff_multiplier'] == 1 or 'Base Tariff' not in df.columns:
+        return df
+    return df.assign(**{'Base Tariff': df['Base Tariff'] * scenario['tariff_multiplier']})
+
+
+def _stacked(scenarios, key):
+    """{sub-key: (scenarios, 1) array} so calc functions broadcast scenarios against clients"""
+    return {name: np.array([s[key][name] for s in scenarios])[:, None] for name in scenarios[0][key]}
+
+
+def evaluate_scenarios(df, scenarios, bess_pct=BESS_STEPS):
+    """ROI (%) of every scenario x client x option in one broadcast.
+
+    Returns {'solar_to_cd', 'solar_to_sl', 'wind'} of shape (scenarios, clients)
+    and 'bess' of shape (scenarios, clients, sizes).
+    """
+    capex, generation = _stacked(scenarios, 'capex'), _stacked(scenarios, 'generation')
+    tariff = _column(df, 'Base Tariff') * np.array([s['tariff_multiplier'] for s in scenarios])[:, None]
+    contract_demand = _column(df, 'Contract Demand (mVA)')
+    to_cd, to_sl = calc.solar_roi(contract_demand, _column(df, 'Sanctioned Load (mVA)'),
+                                  _column(df, 'Installed Solar Capacity (AC)'), tariff, capex, generation)
+    steps = np.asarray(bess_pct)
+    bess = calc.bess_roi(_column(df, 'Annual Consumption')[:, None],
+                         _column(df, 'Installed Solar Capacity (DC)')[:, None], steps,
+                         {name: value[..., None] for name, value in capex.items()})
+    shape = (len(scenarios), len(df))
+    return {
+        'solar_to_cd': np.broadcast_to(to_cd, shape) * 100,
+        'solar_to_sl': np.broadcast_to(to_sl, shape) * 100,
+        'wind': np.broadcast_to(calc.wind_roi(contract_demand, tariff, capex, generation), shape) * 100,
+        'bess': np.broadcast_to(bess, shape + steps.shape) * 100,
+    }
+
+
+def _snapshot_tables(df, sweep, i):
+    """Scenario i of a sweep in the snapshot's base_roi / bess_grid layout"""
+    base_table = pd.DataFrame({
+        'Client Name': df['Client Name'].to_numpy(),
+        'Solar to CD': sweep['solar_to_cd'][i],
+        'Solar to SL': sweep['solar_to_sl'][i],
+        'Wind': sweep['wind'][i],
+    }, index=df.index)
+    steps = np.asarray(BESS_STEPS)
+    grid = {'bess_pct': steps, 'waiver_pct': calc.waiver_percentage(steps), 'bess_roi': sweep['bess'][i]}
+    return base_table, grid
+
+
+class ScenarioResults:
+    """Scenario ROI tables per snapshot version and scenario hash; all but the base case are
+    held in the bounded RESULT_CACHE so uploaded scenarios are evicted like any other result"""
+
+    def __init__(self, cache=RESULT_CACHE):
+        self._cache = cache
+
+    def get(self, snapshot, scenarios):
+        """{scenario hash: (base_roi table, bess grid)} for `scenarios`, computing only uncached
+        scenarios, all of them in one evaluate_scenarios call. Base-case assumptions are served
+        from the snapshot's own tables, which reloads keep up to date incrementally."""
+        by_hash = {scenario_hash(s): s for s in scenarios}
+        base_key = scenario_hash(make_scenario(BASE_CASE))
+        results = {key: (snapshot['base_roi'], snapshot['bess_grid']) if key == base_key
+                   else self._cache.get((snapshot['version'], 'scenario', key)) for key in by_hash}
+        missing = [key for key, tables in results.items() if tables is None]
+        if missing:
+            df = snapshot['df']
+            sweep = evaluate_scenarios(df, [by_hash[key] for key in missing])
+            for i, key in enumerate(missing):
+                tables = _snapshot_tables(df, sweep, i)
+                results[key] = self._cache.get_or_compute((snapshot['version'], 'scenario', key), lambda: tables)
+        return results
+
+
+def scenario_comparison(results, scenarios, position, bess_pct):
+    """One client's ROI (%) per option under each scenario, one row per scenario"""
+    step = BESS_STEPS.index(bess_pct)
+    rows = []
+    for scenario in scenarios:
+        base_table, grid = results[scenario_hash(scenario)]
+        row = base_table.iloc[position]
+        rows.append({'Scenario': scenario['name'], 'Solar to CD': row['Solar to CD'],
+                     'Solar to SL': row['Solar to SL'], 'BESS': grid['bess_roi'][position, step],
+                     'Wind': row['Wind']})
+    return pd.DataFrame(rows)
@@ -0,0 +1,11 @@
+import pytest
+
+import ingest
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keep each test's Arrow cache in its own temporary directory"""
+    path = tmp_path / "cache"
+    monkeypatch.setattr(ingest, 'CACHE_DIR', str(path))
+    return path
@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+import pytest
+
+import api
+from benchmarks.synthetic import synthetic_portfolio
+from datastore import ClientStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    """ClientStore over a small synthetic portfolio"""
+    path = str(tmp_path / "clients.csv")
+    synthetic_portfolio(50, seed=5).to_csv(path, index=False)
+    return ClientStore(path, None)
+
+
+def exchange(store, raw):
+    """Raw HTTP request bytes in, (status, JSON body) out, through the real connection handler"""
+    async def run():
+        server = await asyncio.start_server(api.make_handler(store), '127.0.0.1', 0)
+        async with server:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            writer.write(raw)
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+        head, _, body = response.partition(b'\r\n\r\n')
+        return int(head.split()[1]), json.loads(body)
+    return asyncio.run(run())
+
+
+def request(store, method, path, body=None):
+    payload = b'' if body is None else json.dumps(body).encode()
+    return exchange(store, f"{method} {path} HTTP/1.1\r\nContent-Length: {len(payload)}\r\n"
+                           f"Connection: close\r\n\r\n".encode() + payload)
+
+
+def test_get_client(store):
+    status, result = request(store, 'GET', '/clients/CLIENT%200000007?bess_pct=25')
+    assert status == 200
+    assert result['Client Name'] == 'CLIENT 0000007' and result['BESS Size (% of Solar)'] == 25
+
+
+@pytest.mark.parametrize('bess_pct', [10, 10.0, "10"])
+def test_whole_bess_sizes_are_accepted(store, bess_pct):
+    status, result = request(store, 'POST', '/clients', {'clients': ['CLIENT 0000001'], 'bess_pct': bess_pct})
+    assert status == 200 and result['results'][0]['BESS Size (% of Solar)'] == 10
+
+
+@pytest.mark.parametrize('bess_pct', [10.9, "10.9", 1e400, -1e400, True, None, [10], 7])
+def test_other_bess_sizes_are_rejected(store, bess_pct):
+    status, result = request(store, 'POST', '/clients', {'clients': ['CLIENT 0000001'], 'bess_pct': bess_pct})
+    assert status == 400 and 'bess_pct' in result['error']
+
+
+def test_query_string_bess_size_is_not_truncated(store):
+    assert request(store, 'GET', '/clients/CLIENT%200000001?bess_pct=10.9')[0] == 400
+
+
+def test_negative_content_length_is_a_bad_request(store):
+    status, result = exchange(store, b"POST /clients HTTP/1.1\r\nContent-Length: -5\r\n\r\n")
+    assert status == 400 and 'Content-Length' in result['error']
+
+
+def test_unexpected_errors_still_get_a_response(store, monkeypatch):
+    def fail(*args):
+        raise OverflowError("boom")
+    monkeypatch.setattr(api, 'get_client', fail)
+    status, result = request(store, 'GET', '/clients/CLIENT%200000001')
+    assert status == 500 and result['error'] == "OverflowError: boom"
@@ -0,0 +1,76 @@
+import io
+
+import pandas as pd
+import pytest
+
+import batch_report
+from benchmarks.synthetic import synthetic_portfolio
+from roi import compute_roi
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    portfolio = synthetic_portfolio(4, seed=8)
+    path = tmp_path / "clients.xlsx"
+    portfolio.to_excel(path, sheet_name="Sheet1", index=False)
+    return str(path), portfolio
+
+
+def report(workbook, out, *args):
+    path, _ = workbook
+    batch_report.main(['--data', path, '--out', str(out), '--bess-pct', '10', *args])
+
+
+def test_run_reports_every_client(tmp_path, workbook):
+    out = tmp_path / "reports"
+    report(workbook, out, '--workers', '1', '--chunk-size', '3')
+    _, portfolio = workbook
+
+    clients = pd.read_csv(out / "clients.csv", keep_default_na=False)
+    assert len(clients) == len(portfolio)
+    names = [batch_report.report_name(i, name) for i, name in enumerate(portfolio['Client Name'])]
+    assert sorted(clients['Report']) == sorted(names)
+    assert (clients['Error'] == '').all()
+    for name in names:
+        assert (out / f"{name}.html").stat().st_size > 0
+        assert pd.read_csv(out / f"{name}.csv").columns.tolist() == ['Section', 'Parameter', 'Value']
+
+    summary = pd.read_csv(out / "portfolio_summary.csv")
+    expected = compute_roi(portfolio, 10).groupby('Best Option')['Best ROI (%)'].agg(['size', 'mean'])
+    assert summary['Clients'].sum() == len(portfolio)
+    assert summary['Best Option'].tolist() == expected.index.tolist()
+    assert summary['Clients'].tolist() == expected['size'].tolist()
+    assert summary['Mean Best ROI (%)'].tolist() == pytest.approx(expected['mean'].tolist())
+    assert (summary['Failed Reports'] == 0).all()
+
+
+def test_a_client_that_fails_to_render_does_not_stop_the_batch(tmp_path, workbook, monkeypatch):
+    _, portfolio = workbook
+    broken = portfolio['Client Name'].iloc[1]
+    render = batch_report.client_report
+
+    def client_report(selected, roi_row, bess_pct):
+        if selected['Client Name'] == broken:
+            raise KeyError('Base Tariff')
+        return render(selected, roi_row, bess_pct)
+
+    monkeypatch.setattr(batch_report, 'client_report', client_report)
+    out = tmp_path / "reports"
+    progress = io.StringIO()
+    portfolio_summary = batch_report.run(batch_report.iter_chunks(portfolio, 2), len(portfolio), 10, str(out),
+                                         workers=1, progress=progress)
+
+    clients = pd.read_csv(out / "clients.csv", keep_default_na=False).set_index('Client Name')
+    assert len(clients) == len(portfolio)
+    assert clients.loc[broken, 'Report'] == '' and 'KeyError' in clients.loc[broken, 'Error']
+    assert (clients.drop(broken)['Error'] == '').all()
+    assert len(list(out.glob("*.html"))) == len(portfolio) - 1
+    assert portfolio_summary['Failed Reports'].sum() == 1
+    assert f"Could not render the report for {broken}" in progress.getvalue()
+    assert portfolio_summary['Clients'].sum() == len(portfolio)
+
+
+def test_failed_reports_give_a_failing_exit_status(tmp_path, workbook, monkeypatch):
+    monkeypatch.setattr(batch_report, 'client_report', lambda *args: 1 / 0)
+    with pytest.raises(SystemExit, match="4 client reports could not be rendered"):
+        report(workbook, tmp_path / "reports", '--workers', '1')
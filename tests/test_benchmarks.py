@@ -0,0 +1,86 @@
+"""Core-stage benchmarks on synthetic portfolios of 1k, 100k and (with -m slow) 1M clients.
+
+Run: python -m pytest tests/test_benchmarks.py [-m slow] [--benchmark-autosave]
+Saved runs can be compared with pytest-benchmark compare to track throughput over time.
+"""
+import pytest
+
+from benchmarks.synthetic import synthetic_portfolio
+from formatting import format_indian_batch
+from ingest import iter_chunks, read_cached, write_store
+from ranking import build_ranking, query
+from roi import base_roi, compute_bess_grid, compute_opportunities, compute_roi
+
+SIZES = [1_000, 100_000, pytest.param(1_000_000, marks=pytest.mark.slow)]
+
+
+@pytest.fixture(scope='module', params=SIZES, ids=lambda rows: f"{rows:,}")
+def portfolio(request, tmp_path_factory):
+    """(rows, CSV path, Arrow store path, client table read back from the store)"""
+    rows = request.param
+    workdir = tmp_path_factory.mktemp(f"portfolio-{rows}")
+    csv_path, store_path = str(workdir / "portfolio.csv"), str(workdir / "portfolio.arrow")
+    synthetic_portfolio(rows).to_csv(csv_path, index=False)
+    write_store(iter_chunks(csv_path), store_path)
+    return rows, csv_path, store_path, read_cached(store_path)
+
+
+@pytest.fixture(scope='module')
+def ranking(portfolio):
+    df = portfolio[3]
+    return build_ranking(df, compute_opportunities(df), base_roi(df), compute_bess_grid(df), 10)
+
+
+def run(benchmark, rows, func, rounds=None):
+    benchmark.extra_info['clients'] = rows
+    if rounds:
+        return benchmark.pedantic(func, rounds=rounds, iterations=1)
+    return benchmark(func)
+
+
+def test_ingest_csv(benchmark, portfolio, tmp_path):
+    rows, csv_path, _, _ = portfolio
+    target = str(tmp_path / "bench.arrow")
+    run(benchmark, rows, lambda: write_store(iter_chunks(csv_path), target), rounds=1 if rows >= 100_000 else 3)
+
+
+def test_read_store(benchmark, portfolio):
+    rows, _, store_path, df = portfolio
+    assert len(run(benchmark, rows, lambda: read_cached(store_path))) == len(df)
+
+
+def test_opportunities(benchmark, portfolio):
+    rows, _, _, df = portfolio
+    run(benchmark, rows, lambda: compute_opportunities(df))
+
+
+def test_roi(benchmark, portfolio):
+    rows, _, _, df = portfolio
+    run(benchmark, rows, lambda: compute_roi(df, 10))
+
+
+def test_roi_base(benchmark, portfolio):
+    rows, _, _, df = portfolio
+    run(benchmark, rows, lambda: base_roi(df))
+
+
+def test_bess_grid(benchmark, portfolio):
+    rows, _, _, df = portfolio
+    run(benchmark, rows, lambda: compute_bess_grid(df))
+
+
+def test_ranking_build(benchmark, portfolio):
+    rows, _, _, df = portfolio
+    opportunities, base_table, grid = compute_opportunities(df), base_roi(df), compute_bess_grid(df)
+    run(benchmark, rows, lambda: build_ranking(df, opportunities, base_table, grid, 10))
+
+
+def test_ranking_top50(benchmark, portfolio, ranking):
+    positions, _ = run(benchmark, portfolio[0], lambda: query(ranking, 'Wind ROI (%)', 50, voltage_levels=[132.0]))
+    assert len(positions) == 50
+
+
+def test_format_indian_batch(benchmark, portfolio):
+    rows, _, _, df = portfolio
+    values = df['Annual Consumption'].to_numpy()
+    assert run(benchmark, rows, lambda: format_indian_batch(values)).shape == values.shape
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+import calc
+
+# Scalar arguments per function, in call order
+CASES = {
+    calc.waiver_percentage: [(0,), (5,), (25,), (30,), (100,)],
+    calc.solar_to_cd: [(5000.0, 1000.0), (1000.0, 1000.0), (0.0, 0.0), (800.0, 900.0)],
+    calc.solar_to_sl: [(5000.0, 8000.0, 1000.0), (5000.0, 4000.0, 1000.0), (0.0, 0.0, 0.0)],
+    calc.solar_roi: [(5000.0, 8000.0, 1000.0, 7.3), (1000.0, 1000.0, 1000.0, 6.8)],
+    calc.bess_roi: [(1e7, 1400.0, 10), (1e7, 1400.0, 0), (0.0, 0.0, 50)],
+    calc.wind_roi: [(5000.0, 7.3), (0.0, 7.3)],
+    calc.option_economics: [(5000.0, 8000.0, 1000.0, 1400.0, 1e7, 7.3, 10),
+                            (0.0, 0.0, 0.0, 0.0, 0.0, 7.3, 0)],
+}
+
+
+def _outputs(result):
+    return result if isinstance(result, tuple) else (result,)
+
+
+@pytest.mark.parametrize('func', list(CASES), ids=lambda f: f.__name__)
+def test_scalar_inputs_give_scalars(func):
+    for args in CASES[func]:
+        for out in _outputs(func(*args)):
+            # option_economics stacks its options on a trailing axis
+            assert np.ndim(out) == (1 if func is calc.option_economics else 0)
+
+
+@pytest.mark.parametrize('func', list(CASES), ids=lambda f: f.__name__)
+def test_arrays_match_scalar_calls(func):
+    arrays = [np.array(column) for column in zip(*CASES[func])]
+    vectorized = _outputs(func(*arrays))
+    for i, args in enumerate(CASES[func]):
+        for array_out, scalar_out in zip(vectorized, _outputs(func(*args))):
+            assert np.shape(array_out)[0] == len(CASES[func])
+            np.testing.assert_allclose(array_out[i], scalar_out)
+
+
+@pytest.mark.parametrize('bess_pct, waiver', [(0, 0), (5, 75), (10, 80), (25, 95), (30, 100), (100, 100)])
+def test_waiver_percentage(bess_pct, waiver):
+    assert calc.waiver_percentage(bess_pct) == waiver
+    assert calc.waiver_percentage(np.array([bess_pct]))[0] == waiver
+
+
+def test_ratio_is_zero_without_capacity():
+    assert calc.solar_roi(1000.0, 1000.0, 1000.0, 7.3) == (0.0, 0.0)
+    assert calc.wind_roi(0.0, 7.3) == 0.0
+
+
+def test_bess_is_costed_per_mw_of_solar_dc():
+    # 10% of 3.5 MW DC is 0.35 MW; the waiver at 10% is 80%
+    assert calc.bess_mw(3.5, 10) == pytest.approx(0.35)
+    assert calc.bess_roi(1e7, 3.5, 10) == pytest.approx(1e7 * calc.BESS_WAIVER_RATE * 0.80 / (0.35 * calc.CAPEX['bess']))
+    cost, savings = calc.option_economics(2.5, 3.0, 2.5, 3.5, 1e7, 7.3, 10)
+    assert cost[2] == pytest.approx(0.35 * calc.CAPEX['bess'])
+    assert savings[2] / cost[2] == pytest.approx(calc.bess_roi(1e7, 3.5, 10))
@@ -0,0 +1,87 @@
+import altair as alt
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import synthetic_portfolio
+from chartdata import (green_share, headroom_by_voltage, payload_bytes, portfolio_chart_data, raw_payload_bytes,
+                       roi_histograms)
+from ranking import build_ranking
+from roi import ROI_OPTIONS, base_roi, compute_bess_grid, compute_opportunities
+
+
+@pytest.fixture(scope='module')
+def portfolio():
+    df = synthetic_portfolio(2000, seed=4)
+    df.loc[::9, 'Voltage Level'] = np.nan
+    return df
+
+
+@pytest.fixture(scope='module')
+def ranking(portfolio):
+    return build_ranking(portfolio, compute_opportunities(portfolio), base_roi(portfolio),
+                         compute_bess_grid(portfolio), 10)
+
+
+def test_histogram_bins_count_every_finite_roi(ranking):
+    histograms = roi_histograms(ranking)
+    assert histograms['Option'].unique().tolist() == ROI_OPTIONS
+    for option, bins in histograms.groupby('Option'):
+        assert bins['Clients'].sum() == np.isfinite(ranking['values'][f"{option} ROI (%)"]).sum()
+        assert (bins['ROI from (%)'].to_numpy()[1:] == bins['ROI to (%)'].to_numpy()[:-1]).all()
+
+
+def test_histograms_leave_out_nan_and_infinite_roi(ranking):
+    values = dict(ranking['values'])
+    wind = values['Wind ROI (%)'].copy()
+    wind[:10], wind[10:20], wind[20:25] = np.nan, np.inf, -np.inf
+    values['Wind ROI (%)'] = wind
+    bins = roi_histograms(dict(ranking, values=values), options=['Wind'])
+    assert bins['Clients'].sum() == len(wind) - 25
+    assert np.isfinite(bins[['ROI from (%)', 'ROI to (%)']].to_numpy()).all()
+
+    values['Wind ROI (%)'] = np.full(len(wind), np.nan)
+    assert roi_histograms(dict(ranking, values=values), options=['Wind']).empty
+
+
+def test_headroom_groups_clients_by_voltage_level(ranking):
+    table = headroom_by_voltage(ranking)
+    voltage = ranking['voltage']
+    assert table['Voltage Level (kV)'].tolist() == sorted(set(voltage[~np.isnan(voltage)]))
+    assert table['Clients'].sum() == (~np.isnan(voltage)).sum()
+    available = np.maximum(np.nan_to_num(ranking['values']['Available CD AC']), 0)
+    for level, clients, total, mean in table[['Voltage Level (kV)', 'Clients', 'Total Available CD AC',
+                                              'Mean Available CD AC']].itertuples(index=False):
+        in_level = voltage == level
+        assert clients == in_level.sum()
+        assert total == pytest.approx(available[in_level].sum())
+        assert mean == pytest.approx(total / clients)
+
+
+def test_green_share_is_clipped_to_the_whole_consumption(portfolio):
+    df = portfolio.copy()
+    df.loc[:4, 'Percent Green Consumption'] = [-0.5, 0, 1, 1.7, np.nan]
+    table = green_share(df)
+    assert table['Green share from (%)'].iloc[0] == 0 and table['Green share to (%)'].iloc[-1] == 100
+    assert table['Clients'].sum() == df['Percent Green Consumption'].notna().sum()
+    # A share above 1 counts as 100% green, never more than the client's consumption
+    assert (table['Green Consumption'] <= table['Annual Consumption'] * (1 + 1e-12)).all()
+    assert (table['Green Consumption'] >= 0).all()
+    share = table['Green Consumption'] / table['Annual Consumption']
+    assert ((share >= 0) & (share <= 1)).all()
+    assert table['Clients'].iloc[-1] >= 2 and table['Clients'].iloc[0] >= 2
+
+
+def test_aggregated_payload_is_smaller_than_raw_rows(portfolio, ranking):
+    charts = portfolio_chart_data(portfolio, ranking)
+    histogram = charts['roi_histograms'][charts['roi_histograms']['Option'] == 'Wind']
+    chart = alt.Chart(histogram).mark_bar().encode(x=alt.X('ROI from (%)', bin='binned'), x2='ROI to (%)',
+                                                   y='Clients')
+    raw = raw_payload_bytes({'Wind ROI (%)': ranking['values']['Wind ROI (%)']})
+    assert 0 < payload_bytes(chart) < raw
+
+
+def test_raw_payload_is_extrapolated_from_a_sample():
+    values = np.full(100_000, 12.5)
+    # Each row is {"ROI":12.5} plus a separating comma
+    assert raw_payload_bytes({'ROI': values}) == pytest.approx(len('{"ROI":12.5},') * len(values), rel=0.01)
+    assert raw_payload_bytes({'ROI': np.zeros(0)}) == 0
@@ -0,0 +1,138 @@
+import functools
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_portfolio
+import datastore
+import ingest
+from datastore import ClientStore, build_snapshot, diff_clients, update_snapshot
+
+
+@pytest.fixture
+def portfolio():
+    return synthetic_portfolio(500, seed=2)
+
+
+def edited(df):
+    """Copy with two changed clients, one removed, one added and one name repeated"""
+    new = df.drop(index=[3]).copy()
+    new.loc[10, 'Contract Demand (mVA)'] *= 1.5
+    new.loc[20, 'Base Tariff'] = 9.1
+    added = df.iloc[[0, 5]].assign(**{'Client Name': ['NEW CLIENT', df.loc[5, 'Client Name']]})
+    return pd.concat([new, added], ignore_index=True)
+
+
+def test_diff_clients(portfolio):
+    new = edited(portfolio)
+    diff = diff_clients(portfolio, new)
+    recomputed = new['Client Name'].iloc[diff['recompute']].tolist()
+    assert sorted(recomputed) == sorted([portfolio.loc[10, 'Client Name'], portfolio.loc[20, 'Client Name'],
+                                         'NEW CLIENT', portfolio.loc[5, 'Client Name']])
+    assert diff['removed'] == 1
+    assert len(diff['kept']) + len(diff['recompute']) == len(new)
+    pd.testing.assert_frame_equal(portfolio.iloc[diff['kept_from']].reset_index(drop=True),
+                                  new.iloc[diff['kept']].reset_index(drop=True))
+
+
+def test_diff_clients_with_new_columns_recomputes_everything(portfolio):
+    diff = diff_clients(portfolio, portfolio.assign(Region="North"))
+    assert len(diff['recompute']) == len(portfolio) and diff['removed'] == len(portfolio)
+
+
+def test_incremental_snapshot_matches_full_rebuild(portfolio):
+    new = edited(portfolio)
+    incremental = update_snapshot(build_snapshot(portfolio, 1), new, 2)
+    full = build_snapshot(new, 2)
+    assert incremental['reloaded'] == {'recomputed': 4, 'kept': len(new) - 4, 'removed': 1}
+    assert incremental['index'] == full['index']
+    pd.testing.assert_frame_equal(incremental['opportunities'], full['opportunities'])
+    pd.testing.assert_frame_equal(incremental['base_roi'], full['base_roi'])
+    np.testing.assert_array_equal(incremental['bess_grid']['bess_roi'], full['bess_grid']['bess_roi'])
+
+
+def touch(path):
+    """Move the mtime on, so the store notices the change even on coarse filesystem clocks"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_store_reloads_changed_clients(tmp_path, portfolio):
+    path = str(tmp_path / "clients.csv")
+    portfolio.to_csv(path, index=False)
+    store = ClientStore(path, None)
+    edited(portfolio).to_csv(path, index=False)
+    touch(path)
+    snapshot = store.current()
+    assert snapshot['version'] == 2
+    assert snapshot['reloaded']['recomputed'] == 4
+
+
+@pytest.mark.parametrize('suffix, damage', [
+    ('.csv', lambda data: b''),
+    ('.csv', lambda data: b'not,a\nclient,table\n'),
+    ('.xlsx', lambda data: data[:len(data) // 2]),
+    ('.xlsx', lambda data: b'not a workbook'),
+], ids=['empty-csv', 'wrong-columns-csv', 'truncated-xlsx', 'not-a-zip-xlsx'])
+def test_store_keeps_last_good_data_on_bad_reload(tmp_path, portfolio, suffix, damage):
+    path = str(tmp_path / f"clients{suffix}")
+    df = portfolio.head(50)
+    if suffix == '.csv':
+        df.to_csv(path, index=False)
+    else:
+        df.to_excel(path, index=False)
+    store = ClientStore(path, None)
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(damage(data))
+    touch(path)
+    assert store.refresh() is False
+    assert store.last_error
+    assert store.current()['version'] == 1 and len(store.current()['df']) == len(df)
+
+
+
+def test_watcher_survives_a_failing_poll(tmp_path, portfolio, monkeypatch):
+    path = str(tmp_path / "clients.csv")
+    portfolio.to_csv(path, index=False)
+    store = ClientStore(path, None)
+    polls = []
+
+    def refresh():
+        polls.append(1)
+        if len(polls) == 1:
+            raise OSError("workbook vanished")
+        return False
+
+    monkeypatch.setattr(store, 'refresh', refresh)
+    store.start_watcher(interval=0.01)
+    deadline = time.monotonic() + 5
+    while len(polls) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(polls) >= 3 and store._watcher.is_alive()
+    assert store.last_error == "OSError: workbook vanished"
+
+def test_compact_store_reloads_when_categories_change(tmp_path, portfolio, monkeypatch):
+    monkeypatch.setattr(datastore, 'read_workbook', functools.partial(ingest.read_workbook, compact=True))
+    path = str(tmp_path / "clients.csv")
+    regions = np.array(["North", "South"])[np.arange(len(portfolio)) % 2]
+    portfolio.assign(Region=regions).to_csv(path, index=False)
+    store = ClientStore(path, None)
+    assert isinstance(store.snapshot['df']['Region'].dtype, pd.CategoricalDtype)
+
+    regions[:10] = "East"
+    changed = portfolio.assign(Region=regions)
+    changed.loc[100, 'Base Tariff'] = 9.1
+    changed.to_csv(path, index=False)
+    touch(path)
+    snapshot = store.current()
+    assert store.last_error is None
+    assert snapshot['version'] == 2
+    # The ten clients moved to the new region plus the one with a new tariff
+    assert snapshot['reloaded']['recomputed'] == 11
+    full = build_snapshot(snapshot['df'], 2)
+    pd.testing.assert_frame_equal(snapshot['base_roi'], full['base_roi'])
@@ -0,0 +1,73 @@
+import numpy as np
+
+import calc
+import dispatch
+
+
+def _day():
+    """One client, one day: 100 kWh per morning peak hour, 50 per evening peak hour,
+    10 otherwise, and 60 kWh of solar in each hour from 8 AM to 6 PM"""
+    load = np.full(dispatch.HOURS, 10.0)
+    load[dispatch.MORNING_PEAK] = 100
+    load[dispatch.EVENING_PEAK] = 50
+    solar = np.zeros(dispatch.HOURS)
+    solar[dispatch.SOLAR_CHARGE] = 60
+    return load[None, None], solar[None, None]
+
+
+def _random(clients=20, seed=0):
+    rng = np.random.default_rng(seed)
+    load = rng.uniform(0, 300, (clients, dispatch.DAYS, dispatch.HOURS))
+    shape = dispatch.solar_shape()
+    solar = rng.uniform(0, 400, clients)[:, None, None] * shape / shape.max()
+    return load, solar, rng.uniform(0.1, 2, clients), rng.uniform(5, 9, clients)
+
+
+def test_hand_worked_day():
+    load, solar = _day()
+    result = dispatch.simulate_dispatch(load, solar, [0.1], [7.0], [0, 50, 100])
+    # 50%: 50 kW / 200 kWh. Shaves 2 x 50 in the morning, recharges 100 of the
+    # 500 kWh solar surplus, shaves 4 x 50 in the evening and tops up 200 overnight.
+    # 100%: 100 kW / 400 kWh. Shaves 2 x 100, recharges 200, shaves 4 x 50 and tops up 200.
+    np.testing.assert_allclose(result['peak_shaved_kwh'], [[0, 300, 400]])
+    np.testing.assert_allclose(result['solar_shifted_kwh'], [[0, 100 / 0.88, 200 / 0.88]])
+    np.testing.assert_allclose(result['grid_charged_kwh'], [[0, 200 / 0.88, 200 / 0.88]])
+    expected = [0, 300 * 7 * 1.2 - 200 / 0.88 * 7 * 0.85, 400 * 7 * 1.2 - 200 / 0.88 * 7 * 0.85]
+    np.testing.assert_allclose(result['savings'], [expected], rtol=1e-6)
+
+
+def test_energy_is_conserved_within_capacity_and_losses():
+    load, solar, solar_dc, tariff = _random()
+    result = dispatch.simulate_dispatch(load, solar, solar_dc, tariff)
+    capacity = calc.bess_mw(solar_dc[:, None], dispatch.BESS_STEPS) * 1000 * dispatch.BESS_DURATION_HOURS
+    efficiency = dispatch.ROUND_TRIP_EFFICIENCY
+
+    # Every kWh discharged was stored once, either from solar or from the grid, after losses
+    stored = (result['solar_shifted_kwh'] + result['grid_charged_kwh']) * efficiency
+    np.testing.assert_allclose(result['peak_shaved_kwh'], stored, rtol=1e-5)
+    # A full battery plus one recharge per day, never more than the peak-hour load
+    assert (result['peak_shaved_kwh'] <= 2 * capacity * dispatch.DAYS * (1 + 1e-6)).all()
+    assert (result['solar_shifted_kwh'] * efficiency <= capacity * dispatch.DAYS * (1 + 1e-6)).all()
+    peak_load = sum(np.maximum(load - solar, 0)[..., window].sum(axis=(1, 2))
+                    for window in (dispatch.MORNING_PEAK, dispatch.EVENING_PEAK))
+    assert (result['peak_shaved_kwh'] <= peak_load[:, None] * (1 + 1e-6)).all()
+    solar_surplus = np.maximum(solar - load, 0)[..., dispatch.SOLAR_CHARGE].sum(axis=(1, 2))
+    assert (result['solar_shifted_kwh'] <= solar_surplus[:, None] * (1 + 1e-6)).all()
+
+
+def test_no_battery_saves_nothing():
+    load, solar, solar_dc, tariff = _random(clients=5)
+    result = dispatch.simulate_dispatch(load, solar, solar_dc, tariff, [0])
+    for key in ('peak_shaved_kwh', 'solar_shifted_kwh', 'grid_charged_kwh', 'savings'):
+        np.testing.assert_array_equal(result[key], 0)
+
+
+def test_no_solar_surplus_means_no_solar_shifting():
+    load, solar, solar_dc, tariff = _random(clients=5)
+    result = dispatch.simulate_dispatch(load + solar, solar, solar_dc, tariff)
+    np.testing.assert_array_equal(result['solar_shifted_kwh'], 0)
+    # The battery still shaves the peaks, on grid energy bought off-peak
+    assert (result['peak_shaved_kwh'][:, 1:] > 0).all()
+    np.testing.assert_allclose(result['grid_charged_kwh'] * dispatch.ROUND_TRIP_EFFICIENCY,
+                               result['peak_shaved_kwh'], rtol=1e-5)
+
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from formatting import format_indian, format_indian_batch
+
+
+@pytest.mark.parametrize('value, text', [
+    (0, "0"),
+    (999, "999"),
+    (1000, "1,000"),
+    (100000, "1,00,000"),
+    (24230450, "2,42,30,450"),
+    (1234.5, "1,234.5"),
+    (1234.567, "1,234.57"),
+    (-98765.43, "-98,765.43"),
+    (-0.001, "0"),
+    (0.125, "0.13"),
+    (0.375, "0.38"),
+    (1234.125, "1,234.13"),
+    (-1234.125, "-1,234.13"),
+    (-0.005, "-0.01"),
+    (None, "N/A"),
+    (float('nan'), "N/A"),
+    (float('inf'), "N/A"),
+    ("text", "text"),
+])
+def test_format_indian(value, text):
+    assert format_indian(value) == text
+
+
+def test_batch_matches_scalar():
+    rng = np.random.default_rng(0)
+    values = np.concatenate([
+        rng.normal(0, 1e6, 2000).round(3),
+        rng.lognormal(5, 6, 2000) * rng.choice([-1, 1], 2000),
+        rng.integers(0, 10**6, 2000) / 8,  # exact halves of a paisa in binary
+        [0.0, -0.0, 0.004, 0.005, -0.005, 0.125, 0.375, 1234.125, 2**44 + 0.5, 1e15, 9.99e15, 1e16, -3e17,
+         np.nan, np.inf, -np.inf],
+    ])
+    expected = [format_indian(v) for v in values]
+    assert format_indian_batch(values).tolist() == expected
+
+
+def test_batch_keeps_series_index_and_non_numeric_values():
+    series = pd.Series([1500000, None, "n/a", 12.5], index=list("abcd"), name="Load")
+    result = format_indian_batch(series)
+    assert result.index.tolist() == list("abcd") and result.name == "Load"
+    assert result.tolist() == [format_indian(v) for v in series]
+
+
+@pytest.mark.parametrize('values, texts', [
+    ([0.125, 0.375, 0.625, 0.875], ["0.13", "0.38", "0.63", "0.88"]),
+    ([1234.125, -1234.375, 100000.625], ["1,234.13", "-1,234.38", "1,00,000.63"]),
+])
+def test_batch_rounds_halves_up(values, texts):
+    assert format_indian_batch(np.array(values)).tolist() == texts
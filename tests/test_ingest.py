@@ -0,0 +1,108 @@
+import os
+
+import pandas as pd
+import pytest
+
+import ingest
+from benchmarks.synthetic import synthetic_portfolio
+from ingest import iter_chunks
+
+
+@pytest.fixture
+def portfolio():
+    return synthetic_portfolio(30, seed=6)
+
+
+def read_all(path, **kwargs):
+    return pd.concat(iter_chunks(path, **kwargs), ignore_index=True)
+
+
+def test_text_in_the_first_chunk_makes_a_text_column(tmp_path, portfolio):
+    path = str(tmp_path / "clients.csv")
+    portfolio.assign(Region=["North"] + [None] * 29).to_csv(path, index=False)
+    df = read_all(path, chunk_rows=10)
+    assert df['Region'].iloc[0] == "North" and df['Region'].iloc[1:].isna().all()
+
+
+def test_text_after_the_first_chunk_names_the_columns(tmp_path, portfolio):
+    path = str(tmp_path / "clients.csv")
+    df = portfolio.assign(Region=None, Feeder=None).astype({'Region': object, 'Feeder': object})
+    df.loc[25, 'Region'] = "North"
+    df.loc[27, 'Feeder'] = "F-12"
+    df.to_csv(path, index=False)
+    with pytest.raises(ingest.TextColumnError, match="'Region' \\(data row 26 holds 'North'\\), 'Feeder'") as error:
+        read_all(path, chunk_rows=20)
+    assert error.value.columns == ['Region', 'Feeder']
+    df = read_all(path, chunk_rows=20, text_columns=['Region', 'Feeder'])
+    assert df.loc[25, 'Region'] == "North" and df['Region'].drop(25).isna().all()
+
+
+def test_the_store_reads_late_text_columns_as_text(tmp_path, portfolio):
+    path = str(tmp_path / "clients.xlsx")
+    df = portfolio.assign(Region=[7.0] + [None] * 29).astype({'Region': object})
+    df.loc[25, 'Region'] = "North"
+    df.to_excel(path, sheet_name="Sheet1", index=False)
+    stored = ingest.read_workbook(path, "Sheet1", chunk_rows=10)
+    assert stored['Region'].iloc[[0, 25]].tolist() == ["7.0", "North"]
+    assert stored['Region'].drop([0, 25]).isna().all()
+    pd.testing.assert_series_equal(stored['Base Tariff'], portfolio['Base Tariff'])
+
+
+def test_late_text_errors_name_the_sheet_and_its_row(tmp_path, portfolio):
+    path = str(tmp_path / "clients.xlsx")
+    with pd.ExcelWriter(path) as writer:
+        portfolio.iloc[:20].to_excel(writer, sheet_name="North", index=False)
+        south = portfolio.iloc[20:].astype({'Base Tariff': object})
+        south.iloc[3, south.columns.get_loc('Base Tariff')] = "7.3 flat"
+        south.to_excel(writer, sheet_name="South", index=False)
+    message = r"\[South\]: column 'Base Tariff' must be numeric but data row 4 holds '7.3 flat'"
+    with pytest.raises(ValueError, match=message):
+        read_all(path, chunk_rows=10)
+    with pytest.raises(ValueError, match=message):
+        ingest.read_workbook(path, None, chunk_rows=10)
+
+
+def test_sheets_with_the_same_columns_in_any_order_are_combined(tmp_path, portfolio):
+    path = str(tmp_path / "clients.xlsx")
+    with pd.ExcelWriter(path) as writer:
+        portfolio.iloc[:20].to_excel(writer, sheet_name="North", index=False)
+        portfolio.iloc[20:, ::-1].to_excel(writer, sheet_name="South", index=False)
+    df = read_all(path)
+    assert df['Client Name'].tolist() == portfolio['Client Name'].tolist()
+    assert list(df.columns) == list(portfolio.columns)
+
+
+@pytest.mark.parametrize('change, message', [
+    (lambda df: df.assign(Region="South"), "extra: Region; missing: none"),
+    (lambda df: df.drop(columns=['Losses']), "extra: none; missing: Losses"),
+])
+def test_sheets_with_different_columns_are_an_error(tmp_path, portfolio, change, message):
+    path = str(tmp_path / "clients.xlsx")
+    with pd.ExcelWriter(path) as writer:
+        portfolio.iloc[:20].to_excel(writer, sheet_name="North", index=False)
+        change(portfolio.iloc[20:]).to_excel(writer, sheet_name="South", index=False)
+    with pytest.raises(ValueError, match=rf"\[South\] has different columns .*{message}"):
+        read_all(path)
+
+
+def test_same_named_workbooks_in_different_folders_keep_their_caches(tmp_path, portfolio, cache_dir):
+    paths = []
+    for folder, rows in (("north", slice(0, 10)), ("south", slice(10, 30))):
+        (tmp_path / folder).mkdir()
+        paths.append(str(tmp_path / folder / "clients.csv"))
+        portfolio.iloc[rows].to_csv(paths[-1], index=False)
+    stores = [ingest.workbook_store(path, None) for path in paths]
+    assert len(set(stores)) == 2 and all(os.path.exists(store) for store in stores)
+    assert [len(ingest.read_workbook(path, None)) for path in paths] == [10, 20]
+    assert len(list(cache_dir.glob("*.meta.json"))) == 2
+
+
+def test_a_new_ingest_version_rebuilds_the_cache(tmp_path, portfolio, cache_dir, monkeypatch):
+    path = str(tmp_path / "clients.csv")
+    portfolio.to_csv(path, index=False)
+    old = ingest.workbook_store(path, None)
+    old_compact = ingest.compact_store(old)
+    monkeypatch.setattr(ingest, 'INGEST_VERSION', ingest.INGEST_VERSION + 1)
+    new = ingest.workbook_store(path, None)
+    assert new != old and not os.path.exists(old) and not os.path.exists(old_compact)
+    assert ingest.compact_store(new) != old_compact
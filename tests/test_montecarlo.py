@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import synthetic_portfolio
+from montecarlo import _irr, _npv, _payback, client_economics, npv_histogram, simulate, summarize
+from roi import ROI_OPTIONS, compute_roi
+
+
+def annuity(cost, flow, years):
+    """(cost, flows, years) arrays for one scenario of one option"""
+    return np.array([cost], dtype=float), np.full((years, 1), flow, dtype=float), np.arange(1, years + 1, dtype=float)
+
+
+@pytest.mark.parametrize('years, rate', [(1, 0.10), (10, 0.10), (25, 0.02), (25, -0.03), (5, 1.5)])
+def test_irr_of_known_annuities(years, rate):
+    # The level annual flow that repays 1000 at `rate` over `years`
+    flow = 1000 * rate / (1 - (1 + rate) ** -years)
+    cost, flows, years = annuity(1000, flow, years)
+    irr = _irr(cost, flows, years)
+    np.testing.assert_allclose(irr, [rate], atol=1e-9)
+    assert abs(_npv(cost, flows, irr, years)[0]) < 1e-6
+
+
+@pytest.mark.parametrize('flow', [0.0, -5.0])
+def test_irr_is_nan_without_a_sign_change(flow):
+    assert np.isnan(_irr(*annuity(1000, flow, 10))).all()
+
+
+def test_irr_is_vectorized_over_scenarios_and_options():
+    cost = np.array([[100.0, 100.0], [100.0, 200.0]])
+    flows = np.broadcast_to(np.array([[110.0, 120.0], [0.0, 240.0]])[:, None, :], (2, 1, 2))
+    np.testing.assert_allclose(_irr(cost, flows, np.array([1.0])), [[0.1, 0.2], [np.nan, 0.2]], atol=1e-9)
+
+
+def test_payback_interpolates_within_the_crossing_year():
+    cost, flows, _ = annuity(250, 100, 5)
+    np.testing.assert_allclose(_payback(cost, flows), [2.5])
+    cost, flows, _ = annuity(1000, 100, 5)
+    assert np.isnan(_payback(cost, flows)).all()
+
+
+def test_simulate_shapes_and_uninvested_options():
+    cost = np.array([[1e6, 2e6, 0.0, 5e6], [1e6, 1e6, 1e6, 1e6]])
+    savings = cost * 0.15
+    results = simulate(cost, savings, {'scenarios': 300, 'years': 20})
+    for values in results.values():
+        assert values.shape == (2, 300, 4)
+        assert np.isnan(values[0, :, 2]).all()
+        assert np.isfinite(values[1]).all()
+
+
+def test_simulate_without_uncertainty_is_deterministic():
+    assumptions = {'scenarios': 5, 'years': 10, 'escalation_sd': 0.0, 'tariff_escalation': 0.0,
+                   'output_sd': [0.0] * 4, 'degradation': [0.0] * 4, 'capex_sd': 0.0, 'discount_rate': 0.1}
+    results = simulate([[1000.0] * 4], [[162.74539488] * 4], assumptions)
+    np.testing.assert_allclose(results['irr'], 0.10, atol=1e-6)
+    np.testing.assert_allclose(results['npv'], 0.0, atol=1e-4)
+
+
+def test_summary_and_histogram_skip_uninvested_options():
+    results = {key: values[0] for key, values in simulate(
+        [[1e6, 0.0, 1e6, 1e6]], [[2e5, 0.0, 1e5, 3e5]], {'scenarios': 200}).items()}
+    assert 'Solar to SL' not in set(summarize(results)['Option'])
+    assert set(npv_histogram(results)['Option']) <= set(ROI_OPTIONS) - {'Solar to SL'}
+
+
+def test_client_economics_matches_the_simple_yields():
+    df = synthetic_portfolio(50, seed=7)
+    cost, savings = client_economics(df, 10)
+    assert cost.shape == savings.shape == (50, len(ROI_OPTIONS))
+    simple = compute_roi(df, 10)
+    for i, option in enumerate(ROI_OPTIONS):
+        yields = np.divide(savings[:, i], cost[:, i], out=np.zeros(50), where=cost[:, i] > 0) * 100
+        np.testing.assert_allclose(yields, simple[option].to_numpy(), rtol=1e-9)
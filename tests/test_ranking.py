@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import synthetic_portfolio
+from ranking import METRICS, build_ranking, query, ranking_table
+from roi import ROI_OPTIONS, base_roi, compute_bess_grid, compute_opportunities
+
+
+@pytest.fixture(scope='module')
+def ranking():
+    df = synthetic_portfolio(3000, seed=1)
+    df.loc[::7, 'Contract Demand (mVA)'] = np.nan
+    return build_ranking(df, compute_opportunities(df), base_roi(df), compute_bess_grid(df), 10)
+
+
+def brute_force(ranking, metric, top_n, min_value, voltage_levels, best_options):
+    values = ranking['values'][metric]
+    keep = ~np.isnan(values) if min_value is None else values >= min_value
+    if voltage_levels:
+        keep &= np.isin(ranking['voltage'], voltage_levels)
+    if best_options:
+        keep &= np.isin(ranking['best_option'], [ROI_OPTIONS.index(option) for option in best_options])
+    rows = np.flatnonzero(keep)
+    # Descending value, ties in row order
+    return rows[np.lexsort((rows, -values[rows]))][:top_n], int(keep.sum())
+
+
+@pytest.mark.parametrize('metric', METRICS)
+@pytest.mark.parametrize('top_n, min_value, voltage_levels, best_options', [
+    (50, None, None, None),
+    (10, 0.5, None, None),
+    (5000, None, None, None),
+    (50, None, [33.0, 132.0], None),
+    (50, None, None, ['Wind']),
+    (25, 1.0, [11.0], ['Wind', 'BESS']),
+    (1, None, [220.0], ['Solar to CD', 'Solar to SL']),
+])
+def test_query_matches_brute_force(ranking, metric, top_n, min_value, voltage_levels, best_options):
+    positions, matching = query(ranking, metric, top_n, min_value, voltage_levels, best_options)
+    expected, expected_matching = brute_force(ranking, metric, top_n, min_value, voltage_levels, best_options)
+    assert matching == expected_matching
+    np.testing.assert_array_equal(positions, expected)
+
+
+def test_ties_break_by_row_position(ranking):
+    # Wind ROI only depends on the base tariff, so a few values are shared by many clients
+    positions, _ = query(ranking, 'Wind ROI (%)', 100, best_options=list(ROI_OPTIONS))
+    values = ranking['values']['Wind ROI (%)'][positions]
+    assert len(np.unique(values)) < len(values)
+    for value in np.unique(values):
+        tied = positions[values == value]
+        assert (np.diff(tied) > 0).all()
+
+
+def test_ranking_table(ranking):
+    positions, _ = query(ranking, 'Best ROI (%)', 5)
+    table = ranking_table(ranking, positions, 'Best ROI (%)')
+    assert table['Rank'].tolist() == [1, 2, 3, 4, 5]
+    assert table.columns[4] == 'Best ROI (%)'
+    assert table['Client Name'].tolist() == ranking['names'][positions].tolist()
+
+
+def test_missing_values_rank_last_and_never_match(ranking):
+    values = ranking['values']['Available CD AC']
+    assert np.isnan(values).any()
+    assert np.isnan(ranking['ranked']['Available CD AC'][-np.isnan(values).sum():]).all()
+    positions, matching = query(ranking, 'Available CD AC', len(values))
+    assert matching == (~np.isnan(values)).sum() and not np.isnan(values[positions]).any()
+
+
+def test_min_value_is_inclusive(ranking):
+    threshold = ranking['ranked']['Best ROI (%)'][10]
+    positions, matching = query(ranking, 'Best ROI (%)', 1000, min_value=threshold)
+    assert matching == (ranking['values']['Best ROI (%)'] >= threshold).sum()
+    assert ranking['values']['Best ROI (%)'][positions].min() == threshold
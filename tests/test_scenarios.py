@@ -0,0 +1,85 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_portfolio
+from datastore import build_snapshot, update_snapshot
+from dispatch import dispatch_grid
+from ranking import build_ranking
+from resultcache import ResultCache, approx_size
+from scenarios import (ScenarioResults, _snapshot_tables, evaluate_scenarios, make_scenario, parse_scenarios,
+                       scenario_hash)
+
+
+def test_evaluated_base_case_matches_the_snapshot():
+    df = synthetic_portfolio(200, seed=3)
+    snapshot = build_snapshot(df, 1)
+    base_table, grid = _snapshot_tables(df, evaluate_scenarios(df, [make_scenario('Base case')]), 0)
+    pd.testing.assert_frame_equal(base_table, snapshot['base_roi'][base_table.columns])
+    np.testing.assert_allclose(grid['bess_roi'], snapshot['bess_grid']['bess_roi'])
+
+
+def test_base_case_is_served_from_the_snapshot_across_reloads():
+    df = synthetic_portfolio(200, seed=3)
+    snapshot = build_snapshot(df, 1)
+    cache = ResultCache()
+    memo = ScenarioResults(cache)
+    # Same assumptions under another name share the hash, so they are the base case too
+    for base in (make_scenario('Base case'), make_scenario('Renamed')):
+        base_table, grid = memo.get(snapshot, [base])[scenario_hash(base)]
+        assert base_table is snapshot['base_roi'] and grid is snapshot['bess_grid']
+    assert cache.stats()['entries'] == 0
+
+    changed = df.copy()
+    changed.loc[changed.index[0], 'Base Tariff'] += 1
+    reloaded = update_snapshot(snapshot, changed, 2)
+    base_table, grid = memo.get(reloaded, [make_scenario('Base case')])[scenario_hash(make_scenario('Base case'))]
+    assert base_table is reloaded['base_roi'] and grid is reloaded['bess_grid']
+    assert cache.stats()['entries'] == 0
+
+
+def test_uploaded_scenario_results_stay_bounded():
+    snapshot = build_snapshot(synthetic_portfolio(200, seed=3), 1)
+    cache = ResultCache(max_entries=2)
+    memo = ScenarioResults(cache)
+    uploads = [make_scenario(f"Upload {i}", capex={'solar': 3e6 + i * 1e5}) for i in range(5)]
+    results = memo.get(snapshot, uploads)
+    assert cache.stats()['entries'] == 2
+    key = scenario_hash(uploads[-1])
+    assert memo.get(snapshot, [uploads[-1]])[key][0] is results[key][0]
+
+
+def test_cache_holds_a_scenario_table_and_ranking_at_a_million_clients():
+    # Per-client bytes of a scenario table (3 floats, 21 BESS sizes and the client name)
+    # and of a ranking (9 metrics of values, order and ranked, plus names, voltage and indexes)
+    df = synthetic_portfolio(1000, seed=3)
+    snapshot = build_snapshot(df, 1)
+    tables = _snapshot_tables(df, evaluate_scenarios(df, [make_scenario('Cheap', capex={'solar': 3e6})]), 0)
+    ranking = build_ranking(df, snapshot['opportunities'], *tables, 10)
+    per_client = (approx_size(tables) + approx_size(ranking)) / len(df)
+    assert per_client * 1_000_000 < ResultCache().max_bytes
+
+
+def test_dispatch_follows_the_scenario_solar_yield():
+    df = synthetic_portfolio(20, seed=4)
+    base = dispatch_grid(df)
+    sunnier = dispatch_grid(df, generation=make_scenario('Sunny', generation={'solar': 20e5})['generation'])
+    assert sunnier['solar_shifted_kwh'].sum() > base['solar_shifted_kwh'].sum()
+    assert not np.allclose(sunnier['savings'], base['savings'])
+
+
+@pytest.mark.parametrize('kwargs, message', [
+    ({'capex': {'solar': 3e6, 'hydro': 9e6}}, "unknown capex assumption 'hydro'"),
+    ({'generation': {'Solar': 17e5}}, "unknown generation assumption 'Solar'"),
+])
+def test_make_scenario_rejects_unknown_assumptions(kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        make_scenario('Typo', **kwargs)
+
+
+def test_scenario_files_with_unknown_assumptions_are_rejected():
+    content = json.dumps([{'name': 'A', 'capex': {'solar': 3e6}}, {'name': 'B', 'capex': {'hydro': 9e6}}])
+    with pytest.raises(ValueError, match="'B' has unknown capex assumption 'hydro'"):
+        parse_scenarios(content, 'scenarios.json')